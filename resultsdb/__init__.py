@@ -34,6 +34,8 @@ from flask_pyoidc.provider_configuration import (
 from flask_pyoidc.user_session import UserSession
 from flask_session import Session
 
+from resultsdb.authorization import cache_token_introspection
+from resultsdb.lib.json_provider import init_json_provider
 from resultsdb.proxy import ReverseProxied
 from resultsdb.controllers.main import main
 from resultsdb.controllers.api_v2 import api as api_v2
@@ -55,6 +57,8 @@ def create_app(config_obj=None):
     app = Flask(__name__)
     app.secret_key = "replace-me-with-something-random"
 
+    init_json_provider(app)
+
     # make sure app behaves when behind a proxy
     app.wsgi_app = ReverseProxied(app.wsgi_app)
 
@@ -213,6 +217,7 @@ def enable_oidc(app):
         session_refresh_interval_seconds=app.config["OIDC_SESSION_REFRESH_INTERVAL_SECONDS"],
     )
     oidc = OIDCAuthentication({provider: config}, app)
+    cache_token_introspection(oidc)
 
     @app.route("/auth/oidclogin")
     @oidc.oidc_auth(provider)
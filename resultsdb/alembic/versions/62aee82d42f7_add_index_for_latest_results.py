@@ -0,0 +1,37 @@
+"""Add index for latest results per test case
+
+Revision ID: 62aee82d42f7
+Revises: cd581d0e83df
+Create Date: 2026-10-14 17:05:12.418203
+
+"""
+
+# revision identifiers, used by Alembic.
+revision = "62aee82d42f7"
+down_revision = "cd581d0e83df"
+branch_labels = None
+depends_on = None
+
+from alembic import op
+import sqlalchemy as sa
+
+
+def upgrade():
+    # Avoid locking the result table while the index is built.
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "result_idx_testcase_name_submit_time",
+            "result",
+            ["testcase_name", sa.text("submit_time DESC")],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "result_idx_testcase_name_submit_time",
+            table_name="result",
+            postgresql_concurrently=True,
+        )
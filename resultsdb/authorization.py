@@ -1,6 +1,9 @@
 # SPDX-License-Identifier: GPL-2.0+
+import hashlib
 import logging
-from fnmatch import fnmatch
+import re
+import time
+from fnmatch import fnmatch, translate
 
 from werkzeug.exceptions import (
     BadGateway,
@@ -8,8 +11,21 @@ from werkzeug.exceptions import (
     Unauthorized,
 )
 
+from resultsdb.lib.cache import TTLCache
+
 log = logging.getLogger(__name__)
 
+# Caches LDAP groups for (user, LDAP host) to avoid querying LDAP for each
+# request. Users without any groups are cached for shorter time.
+LDAP_GROUPS_CACHE_TTL = 300
+LDAP_NO_GROUPS_CACHE_TTL = 30
+_ldap_groups_cache = TTLCache(maxsize=2048, ttl=LDAP_GROUPS_CACHE_TTL)
+
+# Caches valid OIDC token introspection results by a hash of the
+# Authorization header. Entries expire at the latest when the token does.
+OIDC_TOKEN_CACHE_TTL = 60
+_oidc_token_cache = TTLCache(maxsize=1024, ttl=OIDC_TOKEN_CACHE_TTL)
+
 
 def get_group_membership(ldap, user, con, ldap_search):
     try:
@@ -31,7 +47,35 @@ def get_group_membership(ldap, user, con, ldap_search):
         raise Unauthorized("Some error occurred initializing the LDAP connection.")
 
 
-def match_testcase_permissions(testcase, permissions):
+def index_testcase_permissions(permissions):
+    """
+    Returns a tuple (regex, groups) for matching a test case name against all
+    test case patterns in permissions with a single regular expression.
+
+    Each pattern is translated into an optional lookahead with a named group,
+    so matching the name sets the groups of all matching patterns. The groups
+    dict maps the group names to the indexes of the permissions.
+    """
+    parts = []
+    groups = {}
+    for i, permission in enumerate(permissions):
+        for pattern in permission.get("testcases", []):
+            name = f"permission{len(groups)}"
+            parts.append(f"(?=(?P<{name}>{translate(pattern)}))?")
+            groups[name] = i
+
+    return re.compile("".join(parts)), groups
+
+
+def match_testcase_permissions(testcase, permissions, index=None):
+    if index is not None:
+        regex, groups = index
+        matched = regex.match(testcase).groupdict()
+        indexes = sorted({i for name, i in groups.items() if matched[name] is not None})
+        for i in indexes:
+            yield permissions[i]
+        return
+
     for permission in permissions:
         if "testcases" in permission:
             testcase_match = any(
@@ -41,18 +85,39 @@ def match_testcase_permissions(testcase, permissions):
                 yield permission
 
 
-def verify_authorization(user, testcase, permissions, ldap_host, ldap_searches):
+def verify_authorization(
+    user, testcase, permissions, ldap_host, ldap_searches, permissions_index=None
+):
     if not (ldap_host and ldap_searches):
         raise InternalServerError(
             "LDAP_HOST and LDAP_SEARCHES also need to be defined " "if PERMISSIONS is defined."
         )
 
     allowed_groups = []
-    for permission in match_testcase_permissions(testcase, permissions):
+    for permission in match_testcase_permissions(testcase, permissions, permissions_index):
         if user in permission.get("users", []):
             return True
         allowed_groups += permission.get("groups", [])
 
+    groups = get_user_groups(user, ldap_host, ldap_searches)
+    if any(g in groups for g in allowed_groups):
+        return True
+
+    if not groups:
+        raise Unauthorized(f"Failed to find user {user} in LDAP")
+
+    raise Unauthorized(
+        f"User {user} is not authorized to submit a result for the test case {testcase}"
+    )
+
+
+def get_user_groups(user, ldap_host, ldap_searches):
+    """Returns set of LDAP groups for the user (cached)."""
+    key = (user, ldap_host)
+    groups = _ldap_groups_cache.get(key)
+    if groups is not None:
+        return groups
+
     try:
         import ldap
     except ImportError:
@@ -64,16 +129,39 @@ def verify_authorization(user, testcase, permissions, ldap_host, ldap_searches):
         log.exception("Some error occurred initializing the LDAP connection.")
         raise Unauthorized("Some error occurred initializing the LDAP connection.")
 
-    any_groups_found = False
-    for cur_ldap_search in ldap_searches:
-        groups = get_group_membership(ldap, user, con, cur_ldap_search)
-        if any(g in groups for g in allowed_groups):
-            return True
-        any_groups_found = any_groups_found or len(groups) > 0
+    groups = frozenset(
+        group
+        for cur_ldap_search in ldap_searches
+        for group in get_group_membership(ldap, user, con, cur_ldap_search)
+    )
+    ttl = LDAP_GROUPS_CACHE_TTL if groups else LDAP_NO_GROUPS_CACHE_TTL
+    _ldap_groups_cache.set(key, groups, ttl=ttl)
+    return groups
 
-    if not any_groups_found:
-        raise Unauthorized(f"Failed to find user {user} in LDAP")
 
-    raise Unauthorized(
-        f"User {user} is not authorized to submit a result for the test case {testcase}"
-    )
+def cache_token_introspection(oidc):
+    """
+    Caches valid token introspection results of the OIDCAuthentication
+    instance to avoid calling the introspection endpoint for each request.
+    """
+    introspect_token = oidc.introspect_token
+
+    def cached_introspect_token(request, client, scopes=None):
+        authorization = request.headers["Authorization"].encode()
+        token_hash = hashlib.blake2b(authorization, digest_size=16).digest()
+        key = (token_hash, id(client), tuple(scopes or ()))
+        result = _oidc_token_cache.get(key)
+        if result is not None:
+            return result
+
+        result = introspect_token(request=request, client=client, scopes=scopes)
+        if result is not None:
+            ttl = OIDC_TOKEN_CACHE_TTL
+            exp = result.get("exp")
+            if exp is not None:
+                ttl = min(ttl, exp - time.time())
+            if ttl > 0:
+                _oidc_token_cache.set(key, result, ttl=ttl)
+        return result
+
+    oidc.introspect_token = cached_introspect_token
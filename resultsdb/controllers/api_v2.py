@@ -21,14 +21,15 @@
 import re
 import uuid
 
-from flask import Blueprint, jsonify, request, url_for
+from flask import Blueprint, g, jsonify, request, url_for
 from flask import current_app as app
 from flask_pydantic import validate
 
 from sqlalchemy.orm import exc as orm_exc
+from sqlalchemy.orm import joinedload, load_only, selectinload
 
 from resultsdb.models import db
-from resultsdb.controllers.common import commit_result, SERIALIZE
+from resultsdb.controllers.common import commit_result, SERIALIZE, SERIALIZER
 from resultsdb.parsers.api_v2 import (
     CreateGroupParams,
     CreateResultParams,
@@ -40,6 +41,7 @@ from resultsdb.parsers.api_v2 import (
 )
 from resultsdb.models.results import Group, Result, Testcase, ResultData
 from resultsdb.models.results import result_outcomes
+from resultsdb.lib.cache import TTLCache
 
 api = Blueprint("api_v2", __name__)
 
@@ -62,6 +64,8 @@ RE_PAGE = re.compile(r"([?&])page=([0-9]+)")
 RE_CALLBACK = re.compile(r"([?&])callback=[^&]*&?")
 RE_CLEAN_AMPERSANDS = re.compile(r"&+")
 
+_healthcheck_cache = TTLCache(maxsize=1, ttl=1)
+
 # =============================================================================
 #                               GLOBAL METHODS
 # =============================================================================
@@ -195,6 +199,20 @@ def create_group(body: CreateGroupParams):
 # =============================================================================
 #                                     RESULTS
 # =============================================================================
+def testcase_name_filter(testcases=None, testcases_like=None):
+    """Returns condition matching any of the test case names or patterns, or None."""
+    filter_by_testcase = []
+    if testcases:
+        filter_by_testcase.append(Result.testcase_name.in_(testcases))
+    if testcases_like:
+        for testcase in testcases_like:
+            testcase = testcase.replace("*", "%")
+            filter_by_testcase.append(Result.testcase_name.like(testcase))
+    if not filter_by_testcase:
+        return None
+    return db.or_(*filter_by_testcase)
+
+
 def select_results(
     since_start=None,
     since_end=None,
@@ -236,15 +254,9 @@ def select_results(
         q = q.filter(Result.groups.any(Group.uuid.in_(groups)))
 
     # Filter by testcase_name
-    filter_by_testcase = []
-    if testcases:
-        filter_by_testcase.append(Result.testcase_name.in_(testcases))
-    if testcases_like:
-        for testcase in testcases_like:
-            testcase = testcase.replace("*", "%")
-            filter_by_testcase.append(Result.testcase_name.like(testcase))
-    if filter_by_testcase:
-        q = q.filter(db.or_(*filter_by_testcase))
+    filter_by_testcase = testcase_name_filter(testcases, testcases_like)
+    if filter_by_testcase is not None:
+        q = q.filter(filter_by_testcase)
 
     # Filter by result_data
     if result_data is not None:
@@ -285,6 +297,7 @@ def __get_results_parse_args(query: ResultsParams):
         "_distinct_on": query.distinct_on_,
         "outcome": query.outcome,
         "since": query.since,
+        "_fields": query.fields_,
     }
 
     # find results_data with the query parameters
@@ -324,6 +337,10 @@ def __get_results(query: ResultsParams, group_ids=None, testcase_names=None):
         _sort=args["_sort"],
     )
 
+    fields = args["_fields"]
+    if fields:
+        q = q.options(*result_fields_options(fields))
+
     q = pagination(q, args["page"], args["limit"])
     data, prev, next = prev_next_urls(q.all(), args["limit"])
 
@@ -331,7 +348,7 @@ def __get_results(query: ResultsParams, group_ids=None, testcase_names=None):
         dict(
             prev=prev,
             next=next,
-            data=[SERIALIZE(o) for o in data],
+            data=serialize_results(data, fields),
         )
     )
 
@@ -342,6 +359,149 @@ def get_results(query: ResultsParams):
     return __get_results(query)
 
 
+def select_latest_results(testcases=None, testcases_like=None, **filters):
+    """Selects the most recent results for each test case matching the filters."""
+    q = select_results(testcases=testcases, testcases_like=testcases_like, **filters)
+
+    # Produce a subquery with the same filter criteria as above *except*
+    # test case name, which we group by and join on.
+    sq = (
+        select_results(**filters)
+        .order_by(None)
+        .with_entities(
+            Result.testcase_name.label("testcase_name"),
+            db.func.max(Result.submit_time).label("max_submit_time"),
+        )
+        .group_by(Result.testcase_name)
+        .subquery()
+    )
+    return q.join(
+        sq,
+        db.and_(
+            Result.testcase_name == sq.c.testcase_name,
+            Result.submit_time == sq.c.max_submit_time,
+        ),
+    )
+
+
+def latest_testcase_names(testcases=None, testcases_like=None):
+    """
+    Returns recursive CTE with distinct test case names of results matching
+    the test case names or patterns.
+
+    Each step looks up the next name using the test case name index, so only
+    the matching names are visited. The last row contains NULL name.
+    """
+    name_filter = testcase_name_filter(testcases, testcases_like)
+    if name_filter is None:
+        name_filter = db.true()
+
+    names = (
+        db.select(db.func.min(Result.testcase_name).label("name"))
+        .where(name_filter)
+        .cte("testcase_names", recursive=True)
+    )
+    next_name = (
+        db.select(db.func.min(Result.testcase_name))
+        .where(Result.testcase_name > names.c.name, name_filter)
+        .correlate(names)
+        .scalar_subquery()
+    )
+    return names.union_all(db.select(next_name).where(names.c.name.isnot(None)))
+
+
+def select_latest_results_loose_index_scan(testcases=None, testcases_like=None, **filters):
+    """
+    Selects the most recent result for each test case matching the filters.
+
+    Instead of grouping all matching results, this walks the distinct test
+    case names with a recursive CTE (emulating a loose index scan) and looks
+    up the latest matching result for each name using the
+    (testcase_name, submit_time) index. This is faster if there are many
+    results per test case. Unlike select_latest_results(), only one result
+    is returned per test case if more share the latest submit time.
+    """
+    names = latest_testcase_names(testcases, testcases_like)
+    latest_id = (
+        select_results(_sort="disable_sorting", **filters)
+        .filter(Result.testcase_name == names.c.name)
+        .order_by(db.desc(Result.submit_time))
+        .with_entities(Result.id)
+        .limit(1)
+        .correlate(names)
+        .scalar_subquery()
+    )
+    return select_results().filter(
+        Result.id.in_(db.select(latest_id).where(names.c.name.isnot(None)))
+    )
+
+
+def result_fields_options(fields):
+    """Returns query options loading only data needed for the given result fields."""
+    if not fields:
+        return [
+            joinedload(Result.testcase),
+            selectinload(Result.data),
+            selectinload(Result.groups),
+        ]
+
+    columns = [Result.testcase_name, Result.submit_time]
+    options = []
+    names = {field.partition(".")[0] for field in fields}
+    for name in ("outcome", "note", "ref_url"):
+        if name in names:
+            columns.append(getattr(Result, name))
+    if "data" in names:
+        options.append(selectinload(Result.data))
+    if "groups" in names:
+        options.append(selectinload(Result.groups))
+    if any(field.startswith("testcase") and field != "testcase.name" for field in fields):
+        options.append(joinedload(Result.testcase))
+    return [load_only(*columns), *options]
+
+
+def serialize_results(results, fields=None):
+    if fields:
+        return [SERIALIZER.serialize_result_fields(o, fields) for o in results]
+    return [SERIALIZE(o) for o in results]
+
+
+@api.before_request
+def get_cached_results_latest():
+    """
+    Returns cached /results/latest response if no results were added since.
+
+    The cache key contains the newest result id, so new results invalidate
+    cached responses without having to run the full query. Ids are assigned
+    on insert, so a result committed after one with a higher id is visible
+    only once the cached response expires.
+
+    The key also contains the full URL since responses have absolute links.
+    """
+    ttl = app.config["RESULTS_LATEST_CACHE_TTL"]
+    if not ttl or request.endpoint != "api_v2.get_results_latest":
+        return None
+
+    last_result_id = db.session.query(db.func.max(Result.id)).scalar()
+    key = (request.url, last_result_id)
+    cache = app.extensions.setdefault("api_v2_results_latest", TTLCache(maxsize=256, ttl=ttl))
+    body = cache.get(key)
+    if body is not None:
+        return app.response_class(body, mimetype=app.json.mimetype)
+
+    g._results_latest_cache_key = key
+    return None
+
+
+@api.after_request
+def cache_results_latest(response):
+    key = g.pop("_results_latest_cache_key", None)
+    if key is not None and response.status_code == 200:
+        cache = app.extensions["api_v2_results_latest"]
+        cache.set(key, response.get_data(), ttl=app.config["RESULTS_LATEST_CACHE_TTL"])
+    return response
+
+
 @api.route("/results/latest", methods=["GET"])
 @validate()
 def get_results_latest(query: ResultsParams):
@@ -353,47 +513,34 @@ def get_results_latest(query: ResultsParams):
     testcases = args.get("testcases", None)
     testcases_like = args.get("testcases:like", None)
     distinct_on = args.get("_distinct_on", None)
+    fields = args["_fields"]
 
     if not distinct_on:
-        q = select_results(
-            since_start=since_start,
-            since_end=since_end,
-            groups=groups,
-            testcases=testcases,
-            testcases_like=testcases_like,
-            result_data=p["result_data"],
-        )
-
-        # Produce a subquery with the same filter criteria as above *except*
-        # test case name, which we group by and join on.
-        sq = (
-            select_results(
+        if app.config["USE_LOOSE_INDEX_SCAN"]:
+            q = select_latest_results_loose_index_scan(
                 since_start=since_start,
                 since_end=since_end,
                 groups=groups,
+                testcases=testcases,
+                testcases_like=testcases_like,
                 result_data=p["result_data"],
             )
-            .order_by(None)
-            .with_entities(
-                Result.testcase_name.label("testcase_name"),
-                db.func.max(Result.submit_time).label("max_submit_time"),
+        else:
+            q = select_latest_results(
+                since_start=since_start,
+                since_end=since_end,
+                groups=groups,
+                testcases=testcases,
+                testcases_like=testcases_like,
+                result_data=p["result_data"],
             )
-            .group_by(Result.testcase_name)
-            .subquery()
-        )
-        q = q.join(
-            sq,
-            db.and_(
-                Result.testcase_name == sq.c.testcase_name,
-                Result.submit_time == sq.c.max_submit_time,
-            ),
-        )
 
+        q = q.options(*result_fields_options(fields))
         results = q.all()
 
         return jsonify(
             dict(
-                data=[SERIALIZE(o) for o in results],
+                data=serialize_results(results, fields),
             )
         )
 
@@ -426,12 +573,13 @@ def get_results_latest(query: ResultsParams):
     q = q.distinct(*values_distinct_on)
     q = q.order_by(*values_distinct_on).order_by(db.desc(Result.submit_time))
 
-    results = q.all()
-    results = dict(
-        data=[SERIALIZE(o) for o in results],
+    q = q.options(*result_fields_options(fields))
+    results = sorted(q.all(), key=lambda x: x.submit_time, reverse=True)
+    return jsonify(
+        dict(
+            data=serialize_results(results, fields),
+        )
     )
-    results["data"] = sorted(results["data"], key=lambda x: x["submit_time"], reverse=True)
-    return jsonify(results)
 
 
 @api.route("/groups/<group_id>/results", methods=["GET"])
@@ -606,11 +754,15 @@ def healthcheck():
 
     Returns a 200 response if the application is alive and able to serve requests.
     """
-    try:
-        db.session.execute("SELECT 1 FROM result LIMIT 0").fetchall()
-    except Exception:
-        app.logger.exception("Healthcheck failed on DB query.")
-        return jsonify({"message": "Unable to communicate with database"}), 503
+    # Successful DB probes are reused for a short time so that frequent health
+    # checks do not hit the database on every request. Failures are not cached.
+    if _healthcheck_cache.get("db") is None:
+        try:
+            db.session.execute("SELECT 1 FROM result LIMIT 0").fetchall()
+        except Exception:
+            app.logger.exception("Healthcheck failed on DB query.")
+            return jsonify({"message": "Unable to communicate with database"}), 503
+        _healthcheck_cache.set("db", True)
 
     return jsonify({"message": "Health check OK"}), 200
 
@@ -618,8 +770,12 @@ def healthcheck():
 @api.route("", methods=["GET"])
 @api.route("/", methods=["GET"])
 def landing_page():
-    return (
-        jsonify(
+    # The response depends only on the configuration and the URL root (links
+    # are absolute), so the body is serialized once for each URL root.
+    pages = app.extensions.setdefault("api_v2_landing_page", TTLCache(maxsize=16, ttl=3600))
+    body = pages.get(request.url_root)
+    if body is None:
+        body = jsonify(
             {
                 "message": "Everything is fine. But choose wisely, for while "
                 "the true Grail will bring you life, the false "
@@ -630,6 +786,7 @@ def landing_page():
                 "testcases": url_for(".get_testcases", _external=True),
                 "outcomes": result_outcomes(),
             }
-        ),
-        300,
-    )
+        ).get_data()
+        pages.set(request.url_root, body)
+
+    return app.response_class(body, status=300, mimetype=app.json.mimetype)
@@ -1,11 +1,23 @@
 # SPDX-License-Identifier: GPL-2.0+
-from flask import Blueprint, jsonify, render_template
+import logging
+from functools import cache, lru_cache
+
+from flask import Blueprint, g, jsonify, make_response, render_template, request
 from flask import current_app as app
 from flask_pydantic import validate
+from flask_pydantic.exceptions import ValidationError as FailedValidation
+from pydantic import ValidationError
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
 
 from resultsdb.models import db
-from resultsdb.authorization import match_testcase_permissions, verify_authorization
-from resultsdb.controllers.common import commit_result
+from resultsdb.authorization import (
+    index_testcase_permissions,
+    match_testcase_permissions,
+    verify_authorization,
+)
+from resultsdb.controllers.common import publish_result
+from resultsdb.lib.cache import TTLCache
 from resultsdb.models.results import (
     Result,
     Testcase,
@@ -21,113 +33,249 @@ from resultsdb.parsers.api_v3 import (
 api = Blueprint("api_v3", __name__)
 
 
+def init_permissions():
+    """
+    Stores PERMISSIONS from the configuration and the test case index for
+    them in the application extensions.
+
+    This is called on first use; the configuration is not expected to change
+    afterwards.
+    """
+    perms = tuple(app.config.get("PERMISSIONS", []))
+    app.extensions["resultsdb_permissions_index"] = index_testcase_permissions(perms)
+    app.extensions["resultsdb_permissions"] = perms
+    return perms
+
+
 def permissions():
-    return app.config.get("PERMISSIONS", [])
+    try:
+        return app.extensions["resultsdb_permissions"]
+    except KeyError:
+        return init_permissions()
+
+
+def testcase_permissions(testcase):
+    perms = permissions()
+    index = app.extensions["resultsdb_permissions_index"]
+    return match_testcase_permissions(testcase, perms, index)
 
 
 def _verify_authorization(user, testcase):
     ldap_host = app.config.get("LDAP_HOST")
     ldap_searches = app.config.get("LDAP_SEARCHES")
-    return verify_authorization(user, testcase, permissions(), ldap_host, ldap_searches)
+    return verify_authorization(
+        user,
+        testcase,
+        permissions(),
+        ldap_host,
+        ldap_searches,
+        app.extensions["resultsdb_permissions_index"],
+    )
+
+
+@api.teardown_request
+def clear_request_testcases(exc):
+    g.pop("_testcase_by_name", None)
+
+
+def _request_testcases():
+    """Returns test cases already looked up in the current request by name."""
+    return g.setdefault("_testcase_by_name", {})
+
+
+def get_testcase(name):
+    testcases = _request_testcases()
+    testcase = testcases.get(name)
+    if testcase is not None:
+        return testcase
+
+    testcase = db.session.execute(
+        select(Testcase).where(Testcase.name == name)
+    ).scalar_one_or_none()
+
+    if testcase is not None:
+        testcases[name] = testcase
+    return testcase
+
+
+def upsert_testcase(name, ref_url):
+    """
+    Creates the test case or updates its ref_url (if set) in a single
+    statement. Supported only on PostgreSQL.
+    """
+    stmt = postgresql.insert(Testcase).values(name=name, ref_url=ref_url)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Testcase.name],
+        set_={"ref_url": db.func.coalesce(stmt.excluded.ref_url, Testcase.ref_url)},
+    ).returning(*Testcase.__table__.c)
+    testcase = db.session.execute(
+        select(Testcase).from_statement(stmt).execution_options(populate_existing=True)
+    ).scalar_one()
+    _request_testcases()[name] = testcase
+    return testcase
 
 
 def create_result(body: ResultParamsBase):
     user = app.oidc.current_token_identity[app.config["OIDC_USERNAME_FIELD"]]
     _verify_authorization(user, body.testcase)
 
-    testcase = Testcase.query.filter_by(name=body.testcase).first()
-    if not testcase:
-        app.logger.debug("Testcase %s does not exist yet. Creating", body.testcase)
-        testcase = Testcase(name=body.testcase)
-    if body.testcase_ref_url:
-        app.logger.debug(
-            "Updating ref_url for testcase %s: %s", body.testcase, body.testcase_ref_url
+    # Avoid evaluating log arguments for each request if debug logging is off.
+    debug = app.logger.isEnabledFor(logging.DEBUG)
+
+    testcase = get_testcase(body.testcase)
+    if not testcase and db.engine.dialect.name == "postgresql":
+        if debug:
+            app.logger.debug("Testcase %s not found. Creating or updating", body.testcase)
+        testcase = upsert_testcase(body.testcase, body.testcase_ref_url)
+    else:
+        if not testcase:
+            if debug:
+                app.logger.debug("Testcase %s does not exist yet. Creating", body.testcase)
+            testcase = Testcase(name=body.testcase)
+        if body.testcase_ref_url:
+            if debug:
+                app.logger.debug(
+                    "Updating ref_url for testcase %s: %s", body.testcase, body.testcase_ref_url
+                )
+            testcase.ref_url = body.testcase_ref_url
+        db.session.add(testcase)
+
+    db.session.flush()
+
+    # Write-only path: insert the result and its data with Core
+    # statements instead of tracking new ORM objects in the session.
+    result_id = db.session.execute(
+        Result.__table__.insert().values(
+            testcase_name=testcase.name,
+            outcome=body.outcome,
+            ref_url=body.ref_url,
+            note=body.note,
         )
-        testcase.ref_url = body.testcase_ref_url
-    db.session.add(testcase)
-
-    result = Result(
-        testcase=testcase,
-        outcome=body.outcome,
-        ref_url=body.ref_url,
-        note=body.note,
-        groups=[],
-    )
+    ).inserted_primary_key[0]
 
+    result_data = tuple(body.result_data())
     if user:
-        ResultData(result, "username", user)
+        result_data = (("username", user), *result_data)
+    db.session.execute(
+        ResultData.__table__.insert(),
+        [{"result_id": result_id, "key": name, "value": value} for name, value in result_data],
+    )
+
+    db.session.commit()
+    return publish_result(db.session.get(Result, result_id))
 
-    for name, value in body.result_data():
-        ResultData(result, name, value)
 
-    return commit_result(result)
+def body_validation_error(errors):
+    """Returns response for invalid request body in the flask_pydantic format."""
+    if app.config.get("FLASK_PYDANTIC_VALIDATION_ERROR_RAISE", False):
+        raise FailedValidation(body_params=errors)
+
+    status_code = app.config.get("FLASK_PYDANTIC_VALIDATION_ERROR_STATUS_CODE", 400)
+    return make_response(jsonify({"validation_error": {"body_params": errors}}), status_code)
 
 
 def create_endpoint(params_class, oidc, provider):
-    params = params_class.construct()
+    """Returns URL rules for endpoints of the params class."""
+    artifact_type = params_class.artifact_type()
 
-    @oidc.token_auth(provider)
-    @validate()
-    def create(body: params_class):
+    def create(_parse_obj=params_class.parse_obj):
+        try:
+            body = _parse_obj(request.get_json())
+        except ValidationError as e:
+            return body_validation_error(e.errors())
         return create_result(body)
 
     def get_schema():
-        return jsonify(params.construct().schema()), 200
-
-    artifact_type = params.artifact_type()
-    api.add_url_rule(
-        f"/results/{artifact_type}s",
-        endpoint=f"results_{artifact_type}s",
-        methods=["POST"],
-        view_func=create,
-    )
-    api.add_url_rule(
-        f"/schemas/{artifact_type}s",
-        endpoint=f"schemas_{artifact_type}s",
-        view_func=get_schema,
-    )
+        # Generated on first use and cached in the class by pydantic.
+        return app.json.response(params_class.schema()), 200
+
+    return [
+        (
+            f"/results/{artifact_type}s",
+            f"results_{artifact_type}s",
+            oidc.token_auth(provider)(create),
+            ["POST"],
+        ),
+        (f"/schemas/{artifact_type}s", f"schemas_{artifact_type}s", get_schema, None),
+    ]
 
 
 def create_endpoints(oidc, provider):
-    for params_class in RESULTS_PARAMS_CLASSES:
-        create_endpoint(params_class, oidc, provider)
+    rules = [
+        rule
+        for params_class in RESULTS_PARAMS_CLASSES
+        for rule in create_endpoint(params_class, oidc, provider)
+    ]
+    for rule, endpoint, view_func, methods in rules:
+        api.add_url_rule(rule, endpoint=endpoint, view_func=view_func, methods=methods)
 
 
 @api.route("/permissions")
 @validate()
 def get_permissions(query: PermissionsParams):
     if query.testcase:
-        return list(match_testcase_permissions(query.testcase, permissions()))
+        return app.json.response(tuple(testcase_permissions(query.testcase)))
 
-    return permissions()
+    return app.json.response(permissions())
 
 
-@api.route("/")
-def index():
-    examples = [params_class.example() for params_class in RESULTS_PARAMS_CLASSES]
-    endpoints = [
-        {
-            "name": f"results/{example.artifact_type()}s",
-            "method": "POST",
-            "description": example.__doc__,
-            "query_type": "JSON",
-            "example": example.json(exclude_unset=True, indent=2),
-            "schema": example.schema(),
-            "schema_endpoint": f".schemas_{example.artifact_type()}s",
-        }
-        for example in examples
-    ]
+@lru_cache(maxsize=1)
+def permissions_schema():
+    return PermissionsParams.construct().schema()
+
+
+@cache
+def example_endpoint(params_class):
+    """Returns documentation for endpoint creating results of given type."""
+    example = params_class.example()
+    artifact_type = params_class.artifact_type()
+    return {
+        "name": f"results/{artifact_type}s",
+        "method": "POST",
+        "description": params_class.__doc__,
+        "query_type": "JSON",
+        "example": example.json(exclude_unset=True, indent=2),
+        "schema": params_class.schema(),
+        "schema_endpoint": f".schemas_{artifact_type}s",
+    }
+
+
+@lru_cache(maxsize=1)
+def index_endpoints():
+    """
+    Returns documentation for all endpoints.
+
+    The result depends only on RESULTS_PARAMS_CLASSES, so it is generated only
+    once.
+    """
+    endpoints = [example_endpoint(params_class) for params_class in RESULTS_PARAMS_CLASSES]
     endpoints.append(
         {
             "name": "permissions",
             "method": "GET",
             "description": PermissionsParams.__doc__,
             "query_type": "Query",
-            "schema": PermissionsParams.construct().schema(),
+            "schema": permissions_schema(),
         }
     )
-    return render_template(
-        "api_v3.html",
-        endpoints=endpoints,
-        result_outcomes_extended=", ".join(result_outcomes_extended()),
-    )
+    return endpoints
+
+
+@api.route("/")
+def index():
+    # The page depends only on the configuration and the URL root (links in
+    # the page are absolute), so it is rendered once for each URL root.
+    pages = app.extensions.setdefault("api_v3_index_html", TTLCache(maxsize=16, ttl=3600))
+    html = pages.get(request.url_root)
+    if html is None:
+        html = render_template(
+            "api_v3.html",
+            endpoints=index_endpoints(),
+            result_outcomes_extended=", ".join(result_outcomes_extended()),
+        )
+        pages.set(request.url_root, html)
+
+    response = make_response(html)
+    response.cache_control.public = True
+    response.cache_control.max_age = 300
+    return response
@@ -1,16 +1,18 @@
 # SPDX-License-Identifier: GPL-2.0+
+import logging
+
 from flask import jsonify
 from flask import current_app as app
 
 from resultsdb.models import db
 from resultsdb.messaging import (
     load_messaging_plugin,
-    create_message,
     publish_taskotron_message,
 )
 from resultsdb.serializers.api_v2 import Serializer
 
-SERIALIZE = Serializer().serialize
+SERIALIZER = Serializer()
+SERIALIZE = SERIALIZER.serialize
 
 
 def commit_result(result):
@@ -21,12 +23,28 @@ def commit_result(result):
     """
     db.session.add(result)
     db.session.commit()
+    return publish_result(result)
+
+
+def publish_result(result):
+    """
+    Publishes message for a result already saved in database.
+
+    Returns value for the POST HTTP API response.
+    """
+    # Avoid loading the test case just for logging if debug logging is off.
+    if app.logger.isEnabledFor(logging.DEBUG):
+        app.logger.debug(
+            "Created new result for testcase %s with outcome %s",
+            result.testcase.name,
+            result.outcome,
+        )
 
-    app.logger.debug(
-        "Created new result for testcase %s with outcome %s",
-        result.testcase.name,
-        result.outcome,
-    )
+    # The message has the same structure as the response, so the result is
+    # serialized only once. The response body is encoded before publishing so
+    # that plugins cannot change it by modifying the message.
+    data = SERIALIZE(result)
+    response = jsonify(data)
 
     if app.config["MESSAGE_BUS_PUBLISH"]:
         app.logger.debug("Preparing to publish message for result id %d", result.id)
@@ -34,10 +52,10 @@ def commit_result(result):
             name=app.config["MESSAGE_BUS_PLUGIN"],
             kwargs=app.config["MESSAGE_BUS_KWARGS"],
         )
-        plugin.publish(create_message(result))
+        plugin.publish(data)
 
     if app.config["MESSAGE_BUS_PUBLISH_TASKOTRON"]:
         app.logger.debug("Preparing to publish Taskotron message for result id %d", result.id)
         publish_taskotron_message(result)
 
-    return jsonify(SERIALIZE(result)), 201
+    return response, 201
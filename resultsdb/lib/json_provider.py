@@ -0,0 +1,68 @@
+# SPDX-License-Identifier: GPL-2.0+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider serializing with orjson.
+
+    Dates, dataclasses and other types not supported natively by JSON are
+    still handled by the default provider so the output stays the same.
+    Falls back to the default provider for unsupported dump arguments.
+    """
+
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        if orjson
+        else 0
+    )
+
+    def _dumps_bytes(self, obj, **kwargs):
+        option = self.option
+        if kwargs.pop("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+
+        indent = kwargs.pop("indent", None)
+        if indent:
+            option |= orjson.OPT_INDENT_2
+
+        separators = kwargs.pop("separators", None)
+        if kwargs or indent not in (None, 2) or separators not in (None, (",", ":")):
+            return None
+
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        data = self._dumps_bytes(obj, **kwargs)
+        if data is None:
+            return super().dumps(obj, **kwargs)
+        return data.decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        dump_args = {}
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            dump_args["indent"] = 2
+
+        data = self._dumps_bytes(obj, **dump_args)
+        if data is None:
+            return super().response(obj)
+        return self._app.response_class(data + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Uses orjson for JSON responses if it is installed."""
+    if orjson is not None:
+        app.json = OrjsonProvider(app)
@@ -19,13 +19,14 @@
 
 import abc
 import json
+from collections import deque
+from functools import lru_cache
 
 import pkg_resources
 import stomp
 
 from resultsdb.models import db
 from resultsdb.models.results import Result, ResultData
-from resultsdb.serializers.api_v2 import Serializer
 
 import logging
 
@@ -39,8 +40,6 @@ from fedora_messaging.exceptions import (
 
 log = logging.getLogger(__name__)
 
-SERIALIZE = Serializer().serialize
-
 
 def get_prev_result(result):
     """
@@ -120,11 +119,6 @@ def publish_taskotron_message(result):
         log.error("Error sending message {}: {}".format(msg.id, e.reason))
 
 
-def create_message(result):
-    # Re-use the same structure as in the HTTP API v2.
-    return SERIALIZE(result)
-
-
 class MessagingPlugin(object):
     """Abstract base class that messaging plugins must extend.
 
@@ -147,9 +141,9 @@ class MessagingPlugin(object):
 class DummyPlugin(MessagingPlugin):
     """A dummy plugin used for testing.  Just logs the messages."""
 
-    # A class attribute where we store all messages published.
-    # Used by the test suite.  This would cause a memory leak if used in prod.
-    history = []
+    # A class attribute where we store the last messages published.
+    # Used by the test suite.
+    history = deque(maxlen=1024)
 
     def publish(self, message):
         self.history.append(message)
@@ -224,13 +218,25 @@ class StompPlugin(MessagingPlugin):
             conn.disconnect()
 
 
-def load_messaging_plugin(name, kwargs):
-    """Instantiate and return the appropriate messaging plugin."""
+@lru_cache(maxsize=1)
+def messaging_plugin_classes():
+    """
+    Returns installed messaging plugin classes by name.
+
+    Entry points are scanned only once since the installed plugins do not
+    change while the application is running.
+    """
     points = pkg_resources.iter_entry_points("resultsdb.messaging.plugins")
     classes = {"dummy": DummyPlugin}
     classes.update(dict([(point.name, point.load()) for point in points]))
 
     log.debug("Found the following installed messaging plugin %r" % classes)
+    return classes
+
+
+def load_messaging_plugin(name, kwargs):
+    """Instantiate and return the appropriate messaging plugin."""
+    classes = messaging_plugin_classes()
     if name not in classes:
         raise KeyError("%r not found in %r" % (name, classes.keys()))
 
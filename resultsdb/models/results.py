@@ -115,6 +115,12 @@ class Result(db.Model, DBSerialize):
             postgresql_ops={"testcase_name": "text_pattern_ops"},
         ),
         db.Index("result_submit_time", "submit_time"),
+        # Latest results per test case (/results/latest)
+        db.Index(
+            "result_idx_testcase_name_submit_time",
+            "testcase_name",
+            db.text("submit_time DESC"),
+        ),
         db.Index(
             "result_idx_outcome",
             "outcome",
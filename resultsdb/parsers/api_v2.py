@@ -11,6 +11,21 @@ from resultsdb.models.results import result_outcomes
 
 QUERY_LIMIT = 20
 
+RESULT_FIELDS = (
+    "id",
+    "groups",
+    "testcase",
+    "testcase.name",
+    "testcase.ref_url",
+    "testcase.href",
+    "submit_time",
+    "outcome",
+    "note",
+    "ref_url",
+    "data",
+    "href",
+)
+
 
 def parse_since(since):
     since_start = None
@@ -74,6 +89,7 @@ class ResultsParams(BaseListParams):
     testcases: Optional[QueryList]
     testcases_like_: Optional[QueryList] = Field(alias="testcases:like")
     distinct_on_: Optional[QueryList] = Field(alias="_distinct_on")
+    fields_: Optional[QueryList] = Field(alias="_fields")
 
     @validator("since", pre=True)
     def parse_since(cls, v):
@@ -90,6 +106,12 @@ class ResultsParams(BaseListParams):
             raise ValueError(f'must be one of: {", ".join(result_outcomes())}')
         return outcomes
 
+    @validator("fields_")
+    def fields_must_be_valid(cls, v):
+        if any(x not in RESULT_FIELDS and not (x.startswith("data.") and x != "data.") for x in v):
+            raise ValueError(f'must be one of: {", ".join(RESULT_FIELDS)}, data.<key>')
+        return list(dict.fromkeys(v))
+
 
 class CreateResultParams(BaseModel):
     outcome: constr(min_length=1, strip_whitespace=True, to_upper=True)
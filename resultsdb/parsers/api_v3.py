@@ -1,5 +1,6 @@
 # SPDX-License-Identifier: GPL-2.0+
 from collections.abc import Iterator
+from functools import cache
 from textwrap import dedent
 from typing import List, Optional
 
@@ -52,6 +53,23 @@ def result_outcomes_extended():
     return outcomes + additional_outcomes
 
 
+@cache
+def result_data_fields(params_class):
+    """Returns names of fields to store as result data for the params class."""
+    exclude = params_class.exclude() | MAIN_RESULT_ATTRIBUTES
+    return tuple(name for name in params_class.__fields__ if name not in exclude)
+
+
+def as_str(value):
+    """
+    Converts value to string.
+
+    URL and e-mail fields are already validated str instances, so these are
+    passed as they are instead of being copied.
+    """
+    return value if isinstance(value, str) else str(value)
+
+
 def field(description: str, **kwargs):
     return Field(description=dedent(description).strip(), **kwargs)
 
@@ -220,13 +238,16 @@ class ResultParamsBase(BaseModel):
         else:
             yield ("type", self.artifact_type())
 
-        properties = self.dict(exclude_unset=True, exclude=self.exclude() | MAIN_RESULT_ATTRIBUTES)
-        for name, value in properties.items():
+        fields_set = self.__fields_set__
+        for name in result_data_fields(type(self)):
+            if name not in fields_set:
+                continue
+            value = getattr(self, name)
             if isinstance(value, list):
                 for subvalue in value:
-                    yield (name, str(subvalue))
+                    yield (name, as_str(subvalue))
             else:
-                yield (name, str(value))
+                yield (name, as_str(value))
 
     @validator("outcome")
     def outcome_must_be_valid(cls, v):
@@ -65,6 +65,42 @@ class Serializer(BaseSerializer):
 
         return {key: self.serialize(value) for key, value in rv.items()}
 
+    def serialize_result_fields(self, o, fields):
+        """
+        Serializes only the given fields of a Result.
+
+        Fields "testcase.<name>" and "data.<key>" select only part of the
+        nested objects.
+        """
+        rv = {}
+        for field in fields:
+            name, _, subfield = field.partition(".")
+            if name == "testcase":
+                if subfield == "name":
+                    testcase = {"name": o.testcase_name}
+                elif subfield:
+                    testcase = {subfield: self._serialize_Testcase(o.testcase)[subfield]}
+                else:
+                    testcase = self._serialize_Testcase(o.testcase)
+                rv.setdefault("testcase", {}).update(testcase)
+            elif name == "data":
+                if subfield and "data" in fields:
+                    continue
+                data = rv.setdefault("data", {})
+                for rd in o.data:
+                    if not subfield or rd.key == subfield:
+                        data.setdefault(rd.key, []).append(rd.value)
+            elif name == "groups":
+                rv["groups"] = [group.uuid for group in o.groups]
+            elif name == "submit_time":
+                rv["submit_time"] = o.submit_time.isoformat()
+            elif name == "href":
+                rv["href"] = url_for("api_v2.get_result", result_id=o.id, _external=True)
+            else:
+                rv[name] = getattr(o, name)
+
+        return rv
+
     def _serialize_ResultData(self, o, **kwargs):
         rv = dict(
             key=o.key,
@@ -1,28 +1,102 @@
 import os
+from contextlib import contextmanager
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import make_url
 
 from resultsdb import create_app
+from resultsdb.config import TestingConfig
 from resultsdb.models import db
 
+TEMPLATE_DATABASE = "resultsdb_template"
 
-@pytest.fixture(scope="session", autouse=True)
-def mock_oidc():
+
+def postgres_url():
+    url = make_url(TestingConfig.SQLALCHEMY_DATABASE_URI)
+    if url.get_backend_name() != "postgresql":
+        return None
+    return url
+
+
+def admin_engine(url):
+    return create_engine(url.set(database="resultsdb"), isolation_level="AUTOCOMMIT")
+
+
+def create_template_database():
+    """
+    Creates PostgreSQL template database with the current schema. Worker
+    databases are cloned from it instead of creating the tables again.
+    """
+    url = postgres_url()
+    engine = admin_engine(url)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{TEMPLATE_DATABASE}"'))
+            connection.execute(text(f'CREATE DATABASE "{TEMPLATE_DATABASE}"'))
+    finally:
+        engine.dispose()
+
+    # Creating the app registers all tables, including the Flask-Session one.
+    with mock_oidc_authentication():
+        create_app("resultsdb.config.TestingConfig")
+
+    engine = create_engine(url.set(database=TEMPLATE_DATABASE))
+    try:
+        db.metadata.create_all(engine)
+    finally:
+        engine.dispose()
+
+
+def create_worker_database():
+    """
+    Creates PostgreSQL database for the current pytest-xdist worker from the
+    template database.
+
+    Returns True if the database was created with the schema.
+    """
+    url = postgres_url()
+    if not os.getenv("PYTEST_XDIST_WORKER") or url is None:
+        return False
+
+    engine = admin_engine(url)
+    try:
+        with engine.connect() as connection:
+            connection.execute(text(f'DROP DATABASE IF EXISTS "{url.database}"'))
+            connection.execute(
+                text(f'CREATE DATABASE "{url.database}" TEMPLATE "{TEMPLATE_DATABASE}"')
+            )
+    finally:
+        engine.dispose()
+
+    return True
+
+
+@contextmanager
+def mock_oidc_authentication():
     with patch("resultsdb.OIDCAuthentication") as oidc:
         oidc().token_auth.side_effect = lambda _provider: lambda fn: fn
         oidc().oidc_auth.side_effect = lambda _provider: lambda fn: fn
         oidc().oidc_logout.side_effect = lambda _provider: lambda fn: fn
         oidc().current_token_identity = {"uid": "testuser1"}
+        yield oidc
+
+
+@pytest.fixture(scope="session", autouse=True)
+def mock_oidc():
+    with mock_oidc_authentication():
         yield
 
 
 @pytest.fixture(scope="session", autouse=True)
 def app(mock_oidc):
+    has_schema = create_worker_database()
     app = create_app("resultsdb.config.TestingConfig")
     with app.app_context():
-        db.drop_all()
-        db.create_all()
+        if not has_schema:
+            db.drop_all()
+            db.create_all()
         yield app
 
 
@@ -54,3 +128,34 @@ def pytest_configure(config):
     initial conftest files been loaded."""
 
     os.environ["TEST"] = "true"
+
+    # The pytest-xdist controller prepares the template database once before
+    # starting the workers.
+    is_worker = hasattr(config, "workerinput")
+    if not is_worker and postgres_url() and config.getoption("numprocesses", None):
+        create_template_database()
+
+    # Used by pytest-xdist to keep tests of a class in the same worker.
+    config.addinivalue_line("markers", "xdist_group(name): run tests in the same worker")
+    config.addinivalue_line("markers", "postgres: test requires PostgreSQL database")
+
+
+def pytest_collection_modifyitems(config, items):
+    """
+    Skips tests requiring PostgreSQL if it is disabled or not configured,
+    before setting up any fixtures for them.
+    """
+    if os.getenv("NO_CAN_HAS_POSTGRES", None):
+        reason = "PostgreSQL server not available (disabled with NO_CAN_HAS_POSTGRES)"
+    elif postgres_url() is None:
+        reason = (
+            "PostgreSQL database not configured"
+            f" (current DB URI: {TestingConfig.SQLALCHEMY_DATABASE_URI})"
+        )
+    else:
+        return
+
+    skip = pytest.mark.skip(reason=reason)
+    for item in items:
+        if item.get_closest_marker("postgres"):
+            item.add_marker(skip)
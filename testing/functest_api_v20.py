@@ -17,116 +17,325 @@
 # Authors:
 #   Josef Skladanka <jskladan@redhat.com>
 
-import json
+import csv
 import datetime
-import os
-import copy
-from unittest import TestCase
+import io
+import json
 from unittest.mock import patch
 
+import pytest
 from flask import current_app as app
+from sqlalchemy import event, select, text
+from sqlalchemy.orm import scoped_session, sessionmaker
 
+from resultsdb.controllers import api_v2
+from resultsdb.lib.cache import TTLCache
 import resultsdb.messaging
 from resultsdb.models import db
+from resultsdb.models.results import Group, GroupsToResults, Result, ResultData, Testcase
+from testing.helpers import AboutTime, within_seconds
 
 try:
     basestring
 except NameError:
     basestring = (str, bytes)
 
+FIELD_REQUIRED_ERROR = {
+    field: {
+        "validation_error": {
+            "body_params": [
+                {"loc": [field], "msg": "field required", "type": "value_error.missing"}
+            ]
+        }
+    }
+    for field in ("name", "outcome", "testcase")
+}
+
+EMPTY_TESTCASE_ERROR = {
+    "validation_error": {
+        "body_params": [
+            {
+                "loc": ["testcase"],
+                "msg": "testcase name must be non-empty",
+                "type": "value_error",
+            }
+        ]
+    }
+}
+
 
-class AboutTime(object):
-    def __eq__(self, value):
-        start = (datetime.datetime.utcnow() - datetime.timedelta(seconds=10)).isoformat()
-        stop = (datetime.datetime.utcnow() + datetime.timedelta(seconds=10)).isoformat()
-        return start <= value <= stop
+def truncate_tables(connection):
+    """Removes all rows from the tables and resets the ID sequences."""
+    tables = reversed(db.metadata.sorted_tables)
+    if connection.dialect.name == "postgresql":
+        names = ", ".join(connection.dialect.identifier_preparer.format_table(t) for t in tables)
+        connection.execute(text(f"TRUNCATE TABLE {names} RESTART IDENTITY CASCADE"))
+    else:
+        # SQLite reuses row IDs of deleted rows.
+        for table in tables:
+            connection.execute(table.delete())
 
 
-class TestFuncApiV20(TestCase):
-    def require_postgres(self):
-        if os.getenv("NO_CAN_HAS_POSTGRES", None):
-            self.skipTest("PostgreSQL server not available (disabled with NO_CAN_HAS_POSTGRES)")
+def _sqlite_disable_autobegin(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
 
-        if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
-            raise RuntimeError(
-                "This test requires PostgreSQL to work properly. "
-                "You can disable it by setting NO_CAN_HAS_POSTGRES "
-                "env variable to any non-empty value.\n"
-                f'Current DB URI: { app.config["SQLALCHEMY_DATABASE_URI"] }'
-            )
 
-        assert db.engine.name == "postgresql"
+def _sqlite_begin(connection):
+    connection.exec_driver_sql("BEGIN")
+
 
+@pytest.mark.xdist_group("functest_api_v20")
+class TestFuncApiV20:
     @classmethod
     def setup_class(cls):
-        app.config["MESSAGE_BUS_PUBLISH"] = True
+        # Only test_message_publication() needs to publish messages.
+        cls._message_bus_publish = app.config["MESSAGE_BUS_PUBLISH"]
+        app.config["MESSAGE_BUS_PUBLISH"] = False
         app.config["MESSAGE_BUS_PLUGIN"] = "dummy"
-
-    def setup_method(self, method):
-        db.session.rollback()
-        db.drop_all()
-        db.create_all()
-        self.app = app.test_client()
-        self.ref_url_prefix = "http://localhost/api/v2.0"
+        # Keep the client context entered for the whole class.
+        cls._client = app.test_client()
+        cls.app = cls._client.__enter__()
+        cls.ref_url_prefix = "http://localhost/api/v2.0"
 
         # Testcase data
-        self.ref_testcase_name = "fedora-ci.koji-build./plans/basic.functional"
-        self.ref_testcase_ref_url = (
+        cls.ref_testcase_name = "fedora-ci.koji-build./plans/basic.functional"
+        cls.ref_testcase_ref_url = (
             "http://example.com/fedora-ci.koji-build./plans/basic.functional"
         )
-        self.ref_testcase = {
-            "name": self.ref_testcase_name,
-            "ref_url": self.ref_testcase_ref_url,
-            "href": self.ref_url_prefix + "/testcases/" + self.ref_testcase_name,
+        cls.ref_testcase = {
+            "name": cls.ref_testcase_name,
+            "ref_url": cls.ref_testcase_ref_url,
+            "href": cls.ref_url_prefix + "/testcases/" + cls.ref_testcase_name,
         }
 
         # Group data
-        self.ref_group_uuid = "3ce5f6d7-ce34-489b-ab61-325ce634eab5"
-        self.ref_group_description = "Testing Group"
-        self.ref_group_ref_url = "http://example.com/testing.group"
-        self.ref_group = {
-            "uuid": self.ref_group_uuid,
-            "description": self.ref_group_description,
-            "ref_url": self.ref_group_ref_url,
-            "href": self.ref_url_prefix + "/groups/" + self.ref_group_uuid,
+        cls.ref_group_uuid = "3ce5f6d7-ce34-489b-ab61-325ce634eab5"
+        cls.ref_group_description = "Testing Group"
+        cls.ref_group_ref_url = "http://example.com/testing.group"
+        cls.ref_group = {
+            "uuid": cls.ref_group_uuid,
+            "description": cls.ref_group_description,
+            "ref_url": cls.ref_group_ref_url,
+            "href": cls.ref_url_prefix + "/groups/" + cls.ref_group_uuid,
             "results_count": 0,
-            "results": self.ref_url_prefix + "/results?groups=" + self.ref_group_uuid,
+            "results": cls.ref_url_prefix + "/results?groups=" + cls.ref_group_uuid,
         }
 
         # Result data
-        self.ref_result_id = 1
-        self.ref_result_outcome = "PASSED"
-        self.ref_result_note = "Result Note"
-        self.ref_result_item = "perl-Specio-0.25-1.fc26"
-        self.ref_result_type = "koji_build"
-        self.ref_result_arch = "x86_64"
-        self.ref_result_data = {
-            "item": self.ref_result_item,
-            "type": self.ref_result_type,
-            "arch": self.ref_result_arch,
+        cls.ref_result_id = 1
+        cls.ref_result_outcome = "PASSED"
+        cls.ref_result_note = "Result Note"
+        cls.ref_result_item = "perl-Specio-0.25-1.fc26"
+        cls.ref_result_type = "koji_build"
+        cls.ref_result_arch = "x86_64"
+        cls.ref_result_data = {
+            "item": cls.ref_result_item,
+            "type": cls.ref_result_type,
+            "arch": cls.ref_result_arch,
             "moo": ["boo", "woof"],
         }
-        self.ref_result_ref_url = "http://example.com/testing.result"
-        self.ref_result = {
-            "id": self.ref_result_id,
-            "groups": [self.ref_group["uuid"]],
-            "testcase": self.ref_testcase,
+        cls.ref_result_ref_url = "http://example.com/testing.result"
+        cls.ref_result = cls._make_ref_result()
+        # Request body used by helper_create_result() without arguments.
+        cls._default_result_body = json.dumps(cls._make_result_body()).encode()
+
+        # Request URLs
+        cls.TESTCASE_URL = "/api/v2.0/testcases/" + cls.ref_testcase_name
+        cls.TESTCASE_RESULTS_URL = cls.TESTCASE_URL + "/results"
+        cls.GROUP_URL = "/api/v2.0/groups/" + cls.ref_group_uuid
+        cls.GROUP_RESULTS_URL = cls.GROUP_URL + "/results"
+        cls.RESULT_URL = "/api/v2.0/results/%d" % cls.ref_result_id
+        cls.LATEST_URL = "/api/v2.0/results/latest"
+        cls.TESTCASE_LATEST_URL = cls.LATEST_URL + "?testcases=" + cls.ref_testcase_name
+
+        # Tables are created once by the app fixture and emptied here; each
+        # test runs in a transaction which is rolled back (see db_transaction).
+        db.session.rollback()
+        with db.engine.begin() as connection:
+            truncate_tables(connection)
+
+        if db.engine.name == "sqlite":
+            # The pysqlite driver does not handle SAVEPOINT properly unless
+            # SQLAlchemy emits BEGIN itself.
+            event.listen(db.engine, "connect", _sqlite_disable_autobegin)
+            event.listen(db.engine, "begin", _sqlite_begin)
+
+    @classmethod
+    def teardown_class(cls):
+        cls._client.__exit__(None, None, None)
+        app.config["MESSAGE_BUS_PUBLISH"] = cls._message_bus_publish
+        if db.engine.name == "sqlite":
+            event.remove(db.engine, "connect", _sqlite_disable_autobegin)
+            event.remove(db.engine, "begin", _sqlite_begin)
+
+    @classmethod
+    def _make_ref_result(cls, **overrides):
+        """Builds a fresh copy of the expected reference result."""
+        ref_result = {
+            "id": cls.ref_result_id,
+            "groups": [cls.ref_group_uuid],
+            "testcase": dict(cls.ref_testcase),
             "submit_time": AboutTime(),
-            "outcome": self.ref_result_outcome,
-            "note": self.ref_result_note,
-            "ref_url": self.ref_result_ref_url,
-            "data": dict(
-                (
-                    (key, [value] if isinstance(value, basestring) else value)
-                    for key, value in self.ref_result_data.items()
-                )
-            ),
-            "href": self.ref_url_prefix + "/results/1",
+            "outcome": cls.ref_result_outcome,
+            "note": cls.ref_result_note,
+            "ref_url": cls.ref_result_ref_url,
+            "data": {
+                key: [value] if isinstance(value, basestring) else list(value)
+                for key, value in cls.ref_result_data.items()
+            },
+            "href": cls.ref_url_prefix + "/results/1",
         }
+        ref_result.update(overrides)
+        return ref_result
+
+    def begin_test_transaction(self):
+        """
+        Binds db.session to a connection in a transaction for the test. The
+        application code commits to a SAVEPOINT that is restarted after each
+        commit or rollback.
+        """
+        self._connection = db.engine.connect()
+        self._transaction = self._connection.begin()
+        if db.engine.name == "postgresql":
+            # Sequences are not reset on rollback; tests expect IDs starting
+            # from 1. TRUNCATE ... RESTART IDENTITY is transactional.
+            truncate_tables(self._connection)
+        self._nested = self._connection.begin_nested()
+
+        session_factory = sessionmaker(bind=self._connection, query_cls=db.Query)
+
+        @event.listens_for(session_factory, "after_transaction_end")
+        def restart_savepoint(session, transaction):
+            if not self._nested.is_active:
+                self._nested = self._connection.begin_nested()
+
+        self._db_session = db.session
+        db.session = scoped_session(session_factory)
+
+    def end_test_transaction(self):
+        db.session.remove()
+        db.session = self._db_session
+        self._transaction.rollback()
+        self._connection.close()
+
+    def assert_ref_result(self, data, ref_result=None):
+        """Compares result data with the reference result and submit time."""
+        actual = dict(data)
+        submit_time = actual.pop("submit_time")
+        expected = dict(self.ref_result if ref_result is None else ref_result)
+        expected.pop("submit_time")
+        assert actual == expected
+        assert within_seconds(submit_time, 10), submit_time
+
+    # =============== FIXTURES ==================
+
+    @pytest.fixture(autouse=True)
+    def db_transaction(self):
+        """Runs the test in a transaction which is rolled back afterwards."""
+        self.begin_test_transaction()
+        yield
+        self.end_test_transaction()
+
+    @pytest.fixture(autouse=True)
+    def no_autoflush_for_get_tests(self, request, db_transaction):
+        """Skips autoflush in tests which only read data."""
+        if not request.node.name.startswith("test_get_"):
+            yield
+            return
+
+        with db.session.no_autoflush:
+            yield
+
+    @pytest.fixture
+    def clean_message_history(self, monkeypatch):
+        """Enables publishing messages and clears DummyPlugin.history after the test."""
+        monkeypatch.setitem(app.config, "MESSAGE_BUS_PUBLISH", True)
+        yield
+        resultsdb.messaging.DummyPlugin.history.clear()
+
+    @pytest.fixture
+    def created_testcase(self):
+        r, data = self.helper_create_testcase()
+        assert r.status_code == 201, r.text
+        return data
+
+    @pytest.fixture
+    def created_group(self):
+        r, data = self.helper_create_group()
+        assert r.status_code == 201, r.text
+        return data
+
+    @pytest.fixture
+    def created_result(self, created_group, created_testcase):
+        r, data = self.helper_create_result()
+        assert r.status_code == 201, r.text
+        return data
+
+    # =============== SEEDING ==================
+    # Inserts data directly, for tests that do not check the POST endpoints.
+
+    def seed_testcase(self, name=None, ref_url=None):
+        if name is None:
+            name = self.ref_testcase_name
+        if ref_url is None:
+            ref_url = self.ref_testcase_ref_url
+        db.session.execute(Testcase.__table__.insert().values(name=name, ref_url=ref_url))
+        db.session.commit()
+
+    def seed_group(self, uuid=None, description=None, ref_url=None):
+        if uuid is None:
+            uuid = self.ref_group_uuid
+        if description is None:
+            description = self.ref_group_description
+        if ref_url is None:
+            ref_url = self.ref_group_ref_url
+        db.session.execute(
+            Group.__table__.insert().values(uuid=uuid, description=description, ref_url=ref_url)
+        )
+        db.session.commit()
+
+    def seed_result(self, outcome=None, groups=None, testcase=None, data=None, submit_time=None):
+        """Inserts result for existing test case and groups, returns its ID."""
+        result_id = self._insert_result(outcome, groups, testcase, data, submit_time)
+        db.session.commit()
+        return result_id
+
+    def _insert_result(
+        self, outcome=None, groups=None, testcase=None, data=None, submit_time=None
+    ):
+        if outcome is None:
+            outcome = self.ref_result_outcome
+        if groups is None:
+            groups = [self.ref_group_uuid]
+        if testcase is None:
+            testcase = self.ref_testcase_name
+        if data is None:
+            data = self.ref_result_data
 
-    def teardown_method(self, method):
-        # Reset this for each test.
-        resultsdb.messaging.DummyPlugin.history = []
+        values = dict(
+            testcase_name=testcase,
+            outcome=outcome,
+            note=self.ref_result_note,
+            ref_url=self.ref_result_ref_url,
+        )
+        if submit_time is not None:
+            values["submit_time"] = submit_time
+        result_id = db.session.execute(
+            Result.__table__.insert().values(**values)
+        ).inserted_primary_key[0]
+        if groups:
+            db.session.execute(
+                GroupsToResults.__table__.insert(),
+                [{"group_uuid": uuid, "result_id": result_id} for uuid in groups],
+            )
+        rows = [
+            {"result_id": result_id, "key": key, "value": value}
+            for key, values in data.items()
+            for value in ([values] if isinstance(values, basestring) else values)
+        ]
+        if rows:
+            db.session.execute(ResultData.__table__.insert(), rows)
+        return result_id
 
     # =============== TESTCASES ==================
 
@@ -150,13 +359,7 @@ class TestFuncApiV20(TestCase):
 
         r = self.app.post("/api/v2.0/testcases", data=ref_data, content_type="application/json")
         assert r.status_code == 400
-        assert r.json == {
-            "validation_error": {
-                "body_params": [
-                    {"loc": ["name"], "msg": "field required", "type": "value_error.missing"}
-                ]
-            }
-        }
+        assert r.json == FIELD_REQUIRED_ERROR["name"]
 
     def test_create_testcase_empty_name(self):
         ref_data = json.dumps({"name": ""})
@@ -176,10 +379,8 @@ class TestFuncApiV20(TestCase):
             }
         }
 
-    def test_update_testcase(self):
-        self.test_create_testcase()
-
-        testcase = copy.copy(self.ref_testcase)
+    def test_update_testcase(self, created_testcase):
+        testcase = dict(self.ref_testcase)
         testcase["ref_url"] = "Updated"
 
         ref_data = json.dumps({"name": self.ref_testcase_name, "ref_url": testcase["ref_url"]})
@@ -190,10 +391,8 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 201
         assert data == testcase
 
-    def test_get_testcase(self):
-        self.test_create_testcase()
-
-        r = self.app.get("/api/v2.0/testcases/%s" % self.ref_testcase_name)
+    def test_get_testcase(self, created_testcase):
+        r = self.app.get(self.TESTCASE_URL)
 
         data = json.loads(r.data)
 
@@ -201,7 +400,7 @@ class TestFuncApiV20(TestCase):
         assert data == self.ref_testcase
 
     def test_get_missing_testcase(self):
-        r = self.app.get("/api/v2.0/testcases/%s" % self.ref_testcase_name)
+        r = self.app.get(self.TESTCASE_URL)
 
         data = json.loads(r.data)
 
@@ -215,7 +414,7 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert data["data"] == []
 
-        self.test_create_testcase()
+        self.helper_create_testcase()
 
         r = self.app.get("/api/v2.0/testcases")
         data = json.loads(r.data)
@@ -224,9 +423,7 @@ class TestFuncApiV20(TestCase):
         assert len(data["data"]) == 1
         assert data["data"][0] == self.ref_testcase
 
-    def test_get_testcases_by_name(self):
-        self.test_create_testcase()
-
+    def test_get_testcases_by_name(self, created_testcase):
         r = self.app.get("/api/v2.0/testcases?name=%s" % self.ref_testcase_name)
         data = json.loads(r.data)
 
@@ -275,9 +472,7 @@ class TestFuncApiV20(TestCase):
         assert data["results_count"] == 0
         assert data["results"] == self.ref_url_prefix + "/results?groups=" + data["uuid"]
 
-    def test_update_group(self):
-        self.test_create_group()
-
+    def test_update_group(self, created_group):
         ref_data = json.dumps(
             {"uuid": self.ref_group_uuid, "description": "Changed", "ref_url": "Changed"}
         )
@@ -285,16 +480,14 @@ class TestFuncApiV20(TestCase):
         r = self.app.post("/api/v2.0/groups", data=ref_data, content_type="application/json")
         data = json.loads(r.data)
 
-        group = copy.copy(self.ref_group)
+        group = dict(self.ref_group)
         group["description"] = group["ref_url"] = "Changed"
 
         assert r.status_code == 201
         assert data == group
 
-    def test_get_group(self):
-        self.test_create_group()
-
-        r = self.app.get("/api/v2.0/groups/%s" % self.ref_group_uuid)
+    def test_get_group(self, created_group):
+        r = self.app.get(self.GROUP_URL)
         data = json.loads(r.data)
 
         assert r.status_code == 200
@@ -314,7 +507,7 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert len(data["data"]) == 0
 
-        self.test_create_group()
+        self.helper_create_group()
         r = self.app.get("/api/v2.0/groups")
         data = json.loads(r.data)
 
@@ -322,9 +515,7 @@ class TestFuncApiV20(TestCase):
         assert len(data["data"]) == 1
         assert data["data"][0] == self.ref_group
 
-    def test_get_groups_by_description(self):
-        self.test_create_group()
-
+    def test_get_groups_by_description(self, created_group):
         r = self.app.get("/api/v2.0/groups?description=%s" % self.ref_group_description)
         data = json.loads(r.data)
 
@@ -341,25 +532,20 @@ class TestFuncApiV20(TestCase):
         assert len(data["data"]) == 1
         assert data["data"][0] == self.ref_group
 
-    def test_get_groups_by_more_descriptions(self):
-        r, data = self.helper_create_group(uuid="1", description="FooBar")
-        r, data = self.helper_create_group(uuid="2", description="BarFoo")
+    @pytest.mark.parametrize("query", ("description=FooBar,BarFoo", "description:like=*oo*,*ar*"))
+    def test_get_groups_by_more_descriptions(self, query):
+        self.seed_group(uuid="1", description="FooBar")
+        self.seed_group(uuid="2", description="BarFoo")
 
-        r = self.app.get("/api/v2.0/groups?description=FooBar,BarFoo")
-        data = json.loads(r.data)
-
-        assert r.status_code == 200
-        assert len(data["data"]) == 2
-
-        r = self.app.get("/api/v2.0/groups?description:like=*oo*,*ar*")
+        r = self.app.get("/api/v2.0/groups?" + query)
         data = json.loads(r.data)
 
         assert r.status_code == 200
         assert len(data["data"]) == 2
 
     def test_get_groups_by_more_uuids(self):
-        r, data = self.helper_create_group(uuid="FooBar")
-        r, data = self.helper_create_group(uuid="BarFoo")
+        self.seed_group(uuid="FooBar")
+        self.seed_group(uuid="BarFoo")
 
         r = self.app.get("/api/v2.0/groups?uuid=FooBar,BarFoo")
         data = json.loads(r.data)
@@ -369,54 +555,173 @@ class TestFuncApiV20(TestCase):
 
     # =============== RESULTS ==================
 
-    def helper_create_result(self, outcome=None, groups=None, testcase=None, data=None):
-        if outcome is None:
-            outcome = self.ref_result_outcome
-        if groups is None:
-            groups = [self.ref_group_uuid]
-        if testcase is None:
-            testcase = self.ref_testcase_name
-        if data is None:
-            data = self.ref_result_data
+    @classmethod
+    def _make_result_body(
+        cls, outcome=None, groups=None, testcase=None, data=None, submit_time=None
+    ):
+        body = dict(
+            outcome=cls.ref_result_outcome if outcome is None else outcome,
+            testcase=cls.ref_testcase_name if testcase is None else testcase,
+            groups=[cls.ref_group_uuid] if groups is None else groups,
+            note=cls.ref_result_note,
+            data=cls.ref_result_data if data is None else data,
+            ref_url=cls.ref_result_ref_url,
+        )
+        if submit_time is not None:
+            body["submit_time"] = submit_time
+        return body
 
-        ref_data = json.dumps(
+    def helper_create_results(self, results):
+        """
+        Inserts results in a single transaction, creating missing test cases
+        and groups like the API does.
+
+        Each item contains arguments for helper_create_result(). Results get
+        increasing submit times in the order they are passed.
+        """
+        results = [
             dict(
-                outcome=outcome,
-                testcase=testcase,
-                groups=groups,
-                note=self.ref_result_note,
-                data=data,
-                ref_url=self.ref_result_ref_url,
+                outcome=result.get("outcome", self.ref_result_outcome),
+                groups=result.get("groups", [self.ref_group_uuid]),
+                testcase=result.get("testcase", self.ref_testcase_name),
+                data=result.get("data", self.ref_result_data),
+                submit_time=result.get("submit_time"),
             )
+            for result in results
+        ]
+
+        testcases = {result["testcase"] for result in results}
+        testcases.difference_update(
+            db.session.execute(select(Testcase.name).where(Testcase.name.in_(testcases))).scalars()
         )
+        if testcases:
+            db.session.execute(Testcase.__table__.insert(), [{"name": name} for name in testcases])
+
+        groups = {uuid for result in results for uuid in result["groups"]}
+        groups.difference_update(
+            db.session.execute(select(Group.uuid).where(Group.uuid.in_(groups))).scalars()
+        )
+        if groups:
+            db.session.execute(Group.__table__.insert(), [{"uuid": uuid} for uuid in groups])
+
+        now = datetime.datetime.utcnow()
+        for i, result in enumerate(results, start=1 - len(results)):
+            if result["submit_time"] is None:
+                result["submit_time"] = now + datetime.timedelta(milliseconds=i)
+
+        connection = db.session.connection()
+        is_postgres = connection.dialect.name == "postgresql"
+        result_ids = self._reserve_result_ids(connection, len(results), is_postgres)
+
+        tables = {model: [] for model in (Result, GroupsToResults, ResultData)}
+        for result_id, result in zip(result_ids, results):
+            tables[Result].append(
+                dict(
+                    id=result_id,
+                    testcase_name=result["testcase"],
+                    submit_time=result["submit_time"],
+                    outcome=result["outcome"],
+                    note=self.ref_result_note,
+                    ref_url=self.ref_result_ref_url,
+                )
+            )
+            tables[GroupsToResults].extend(
+                dict(group_uuid=uuid, result_id=result_id) for uuid in result["groups"]
+            )
+            tables[ResultData].extend(
+                dict(result_id=result_id, key=key, value=value)
+                for key, values in result["data"].items()
+                for value in ([values] if isinstance(values, basestring) else values)
+            )
+
+        for model, rows in tables.items():
+            if not rows:
+                continue
+            if is_postgres:
+                self._copy_rows(connection, model.__tablename__, rows)
+            else:
+                connection.execute(model.__table__.insert(), rows)
+
+        db.session.commit()
+
+    @staticmethod
+    def _reserve_result_ids(connection, count, is_postgres):
+        """
+        Returns ids for new results so rows referencing them can be inserted in
+        bulk without fetching the ids back for each result.
+        """
+        if is_postgres:
+            return connection.execute(
+                text(
+                    "SELECT nextval(pg_get_serial_sequence('result', 'id'))"
+                    " FROM generate_series(1, :n)"
+                ),
+                {"n": count},
+            ).scalars()
+
+        # Other backends are only used by a single test session at a time.
+        last_id = connection.execute(select(db.func.max(Result.id))).scalar() or 0
+        return range(last_id + 1, last_id + 1 + count)
+
+    @staticmethod
+    def _copy_rows(connection, table, rows):
+        """
+        Bulk loads rows with COPY FROM STDIN (PostgreSQL only).
+
+        Uses the connection of the current session so the rows are part of
+        the test transaction.
+        """
+        columns = list(rows[0])
+        body = io.StringIO()
+        csv.writer(body).writerows(
+            [r"\N" if row[column] is None else row[column] for column in columns] for row in rows
+        )
+        body.seek(0)
+
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                body,
+            )
+        finally:
+            cursor.close()
+
+    def helper_create_result(
+        self, outcome=None, groups=None, testcase=None, data=None, submit_time=None
+    ):
+        if (outcome, groups, testcase, data, submit_time) == (None,) * 5:
+            ref_data = self._default_result_body
+        else:
+            ref_data = json.dumps(
+                self._make_result_body(
+                    outcome=outcome,
+                    groups=groups,
+                    testcase=testcase,
+                    data=data,
+                    submit_time=submit_time,
+                )
+            )
 
         r = self.app.post("/api/v2.0/results", data=ref_data, content_type="application/json")
         data = json.loads(r.data)
 
         return r, data
 
-    def test_create_result(self):
-        self.test_create_group()
-        self.test_create_testcase()
-
+    def test_create_result(self, created_group, created_testcase):
         r, data = self.helper_create_result()
         assert r.status_code == 201
-        assert data == self.ref_result
+        self.assert_ref_result(data)
 
-    def test_create_result_custom_outcome(self):
-        self.test_create_group()
-        self.test_create_testcase()
-        ref_result = copy.deepcopy(self.ref_result)
-        ref_result["outcome"] = "AMAZING"
+    def test_create_result_custom_outcome(self, created_group, created_testcase):
+        ref_result = self._make_ref_result(outcome="AMAZING")
 
         r, data = self.helper_create_result(outcome="AMAZING")
 
         assert r.status_code == 201
-        assert data == ref_result
+        self.assert_ref_result(data, ref_result)
 
-    def test_create_result_with_testcase_name(self):
-        self.test_create_group()
-        self.test_create_testcase()
+    def test_create_result_with_testcase_name(self, created_group, created_testcase):
         testcase_name = self.ref_result["testcase"]["name"]
 
         r, data = self.helper_create_result(outcome="AMAZING", testcase=testcase_name)
@@ -429,17 +734,7 @@ class TestFuncApiV20(TestCase):
         data = json.loads(r.data)
 
         assert r.status_code == 400
-        assert data == {
-            "validation_error": {
-                "body_params": [
-                    {
-                        "loc": ["testcase"],
-                        "msg": "testcase name must be non-empty",
-                        "type": "value_error",
-                    }
-                ]
-            }
-        }
+        assert data == EMPTY_TESTCASE_ERROR
 
     def test_create_result_empty_testcase_name(self):
         r = self.app.post(
@@ -448,47 +743,21 @@ class TestFuncApiV20(TestCase):
         data = json.loads(r.data)
 
         assert r.status_code == 400
-        assert data == {
-            "validation_error": {
-                "body_params": [
-                    {
-                        "loc": ["testcase"],
-                        "msg": "testcase name must be non-empty",
-                        "type": "value_error",
-                    }
-                ]
-            }
-        }
+        assert data == EMPTY_TESTCASE_ERROR
 
     def test_create_result_empty_testcase_dict(self):
         r = self.app.post("/api/v2.0/results", json={"outcome": "passed", "testcase": {}})
         data = json.loads(r.data)
 
         assert r.status_code == 400
-        assert data == {
-            "validation_error": {
-                "body_params": [
-                    {
-                        "loc": ["testcase"],
-                        "msg": "testcase name must be non-empty",
-                        "type": "value_error",
-                    }
-                ]
-            }
-        }
+        assert data == EMPTY_TESTCASE_ERROR
 
     def test_create_result_missing_testcase(self):
         r = self.app.post("/api/v2.0/results", json={"outcome": "passed"})
         data = json.loads(r.data)
 
         assert r.status_code == 400
-        assert data == {
-            "validation_error": {
-                "body_params": [
-                    {"loc": ["testcase"], "msg": "field required", "type": "value_error.missing"}
-                ]
-            }
-        }
+        assert data == FIELD_REQUIRED_ERROR["testcase"]
 
     def test_create_result_missing_outcome(self):
         ref_data = json.dumps({"testcase": self.ref_testcase})
@@ -496,19 +765,11 @@ class TestFuncApiV20(TestCase):
         data = json.loads(r.data)
 
         assert r.status_code == 400
-        assert data == {
-            "validation_error": {
-                "body_params": [
-                    {"loc": ["outcome"], "msg": "field required", "type": "value_error.missing"}
-                ]
-            }
-        }
+        assert data == FIELD_REQUIRED_ERROR["outcome"]
 
-    def test_create_result_multiple_groups(self):
+    def test_create_result_multiple_groups(self, created_group, created_testcase):
         uuid2 = "1c26effb-7c07-4d90-9428-86aac053288c"
-        self.test_create_group()
         self.helper_create_group(uuid=uuid2)
-        self.test_create_testcase()
 
         r, data = self.helper_create_result(groups=[self.ref_group, uuid2])
 
@@ -517,10 +778,9 @@ class TestFuncApiV20(TestCase):
         assert self.ref_group_uuid in " ".join(data["groups"])
         assert uuid2 in ";".join(data["groups"])
 
-        ref_result = copy.deepcopy(self.ref_result)
-        ref_result["groups"] = None
+        ref_result = self._make_ref_result(groups=None)
         data["groups"] = None
-        assert data == ref_result
+        self.assert_ref_result(data, ref_result)
 
     def test_create_result_group_is_none(self):
         ref_data = json.dumps(
@@ -540,11 +800,10 @@ class TestFuncApiV20(TestCase):
     def test_create_result_group_did_not_exist(self):
         self.helper_create_result(groups=[self.ref_group])
 
-        r = self.app.get("/api/v2.0/groups/%s" % self.ref_group_uuid)
+        r = self.app.get(self.GROUP_URL)
         data = json.loads(r.data)
 
-        ref_group = copy.deepcopy(self.ref_group)
-        ref_group["results_count"] = 1
+        ref_group = dict(self.ref_group, results_count=1)
 
         assert r.status_code == 200
         assert data == ref_group
@@ -562,7 +821,7 @@ class TestFuncApiV20(TestCase):
     def test_create_result_testcase_did_not_exist(self):
         self.helper_create_result(testcase=self.ref_testcase)
 
-        r = self.app.get("/api/v2.0/testcases/%s" % self.ref_testcase_name)
+        r = self.app.get(self.TESTCASE_URL)
         data = json.loads(r.data)
 
         assert r.status_code == 200
@@ -640,21 +899,21 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 201, data
         assert data["submit_time"] == "2022-08-24T06:54:57.123000"
 
-    def test_create_result_submit_time_as_datetime(self):
-        for suffix in ("", "Z", "+00:00", "+0000", "+00"):
-            ref_data = json.dumps(
-                dict(
-                    outcome=self.ref_result_outcome,
-                    testcase=self.ref_testcase,
-                    submit_time=f"2022-08-24T06:54:57.123456{suffix}",
-                )
+    @pytest.mark.parametrize("suffix", ("", "Z", "+00:00", "+0000", "+00"))
+    def test_create_result_submit_time_as_datetime(self, suffix):
+        ref_data = json.dumps(
+            dict(
+                outcome=self.ref_result_outcome,
+                testcase=self.ref_testcase,
+                submit_time=f"2022-08-24T06:54:57.123456{suffix}",
             )
+        )
 
-            r = self.app.post("/api/v2.0/results", data=ref_data, content_type="application/json")
-            data = json.loads(r.data)
+        r = self.app.post("/api/v2.0/results", data=ref_data, content_type="application/json")
+        data = json.loads(r.data)
 
-            assert r.status_code == 201, data
-            assert data["submit_time"] == "2022-08-24T06:54:57.123456"
+        assert r.status_code == 201, data
+        assert data["submit_time"] == "2022-08-24T06:54:57.123456"
 
     def test_create_result_submit_time_as_invalid(self):
         ref_data = json.dumps(
@@ -684,17 +943,15 @@ class TestFuncApiV20(TestCase):
             }
         }
 
-    def test_get_result(self):
-        self.test_create_result()
-
-        r = self.app.get("/api/v2.0/results/%d" % self.ref_result_id)
+    def test_get_result(self, created_result):
+        r = self.app.get(self.RESULT_URL)
         data = json.loads(r.data)
 
         assert r.status_code == 200
-        assert data == self.ref_result
+        self.assert_ref_result(data)
 
     def test_get_missing_result(self):
-        r = self.app.get("/api/v2.0/results/%d" % self.ref_result_id)
+        r = self.app.get(self.RESULT_URL)
         data = json.loads(r.data)
 
         assert r.status_code == 404
@@ -707,14 +964,16 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert data["data"] == []
 
-        self.test_create_result()
+        self.helper_create_group()
+        self.helper_create_testcase()
+        self.helper_create_result()
 
         r = self.app.get("/api/v2.0/results")
         data = json.loads(r.data)
 
         assert r.status_code == 200
         assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
+        self.assert_ref_result(data["data"][0])
 
     def test_get_results_sorted_by_submit_time_desc_by_default(self):
         r1 = self.helper_create_result()
@@ -729,14 +988,13 @@ class TestFuncApiV20(TestCase):
         assert data["data"][0]["id"] == r2[1]["id"]
         assert data["data"][1]["id"] == r1[1]["id"]
 
-    def test_get_results_by_group(self):
+    def test_get_results_by_group(self, created_result):
         uuid2 = "1c26effb-7c07-4d90-9428-86aac053288c"
-        self.helper_create_group(uuid=uuid2)
+        self.seed_group(uuid=uuid2)
 
-        self.test_create_result()
-        self.helper_create_result(groups=[uuid2])
+        self.seed_result(groups=[uuid2])
 
-        r1 = self.app.get("/api/v2.0/groups/%s/results" % self.ref_group_uuid)
+        r1 = self.app.get(self.GROUP_RESULTS_URL)
         r2 = self.app.get("/api/v2.0/results?groups=%s" % self.ref_group_uuid)
 
         data1 = json.loads(r1.data)
@@ -746,7 +1004,7 @@ class TestFuncApiV20(TestCase):
         assert r2.status_code == 200, r2.text
         assert len(data1["data"]) == len(data2["data"]) == 1
         assert data1 == data2
-        assert data1["data"][0] == self.ref_result
+        self.assert_ref_result(data1["data"][0])
 
         r = self.app.get("/api/v2.0/results?groups=%s,%s" % (self.ref_group_uuid, uuid2))
         data = json.loads(r.data)
@@ -754,14 +1012,13 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert len(data["data"]) == 2
 
-    def test_get_results_by_testcase(self):
+    def test_get_results_by_testcase(self, created_result):
         name2 = self.ref_testcase_name + ".fake"
-        self.helper_create_testcase(name=name2)
+        self.seed_testcase(name=name2)
 
-        self.test_create_result()
-        self.helper_create_result(testcase=name2)
+        self.seed_result(testcase=name2)
 
-        r1 = self.app.get("/api/v2.0/testcases/%s/results" % self.ref_testcase_name)
+        r1 = self.app.get(self.TESTCASE_RESULTS_URL)
         r2 = self.app.get("/api/v2.0/results?testcases=%s" % self.ref_testcase_name)
 
         data1 = json.loads(r1.data)
@@ -769,8 +1026,8 @@ class TestFuncApiV20(TestCase):
 
         assert r1.status_code == 200, r1.text
         assert r2.status_code == 200, r2.text
-        assert data1["data"][0] == self.ref_result
-        assert data2["data"][0] == self.ref_result
+        self.assert_ref_result(data1["data"][0])
+        self.assert_ref_result(data2["data"][0])
 
         r = self.app.get("/api/v2.0/results?testcases=%s,%s" % (self.ref_testcase_name, name2))
         data = json.loads(r.data)
@@ -778,14 +1035,13 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert len(data["data"]) == 2
 
-    def test_get_results_by_testcase_like(self):
+    def test_get_results_by_testcase_like(self, created_result):
         name2 = self.ref_testcase_name + ".fake"
-        self.helper_create_testcase(name=name2)
+        self.seed_testcase(name=name2)
 
-        self.test_create_result()
-        self.helper_create_result(testcase=name2)
+        self.seed_result(testcase=name2)
 
-        r1 = self.app.get("/api/v2.0/testcases/%s/results" % self.ref_testcase_name)
+        r1 = self.app.get(self.TESTCASE_RESULTS_URL)
         r2 = self.app.get("/api/v2.0/results?testcases:like=%s" % self.ref_testcase_name)
 
         data1 = json.loads(r1.data)
@@ -793,8 +1049,8 @@ class TestFuncApiV20(TestCase):
 
         assert r1.status_code == 200, r1.text
         assert r2.status_code == 200, r2.text
-        assert data1["data"][0] == self.ref_result
-        assert data2["data"][0] == self.ref_result
+        self.assert_ref_result(data1["data"][0])
+        self.assert_ref_result(data2["data"][0])
 
         r1 = self.app.get("/api/v2.0/results?testcases:like=%s*" % (self.ref_testcase_name,))
         r2 = self.app.get(
@@ -808,29 +1064,25 @@ class TestFuncApiV20(TestCase):
         assert r1.status_code == r2.status_code == 200
         assert data1 == data2
 
-    def test_get_results_by_outcome(self):
-        self.test_create_result()
-        self.helper_create_result(outcome="FAILED")
-
-        r = self.app.get("/api/v2.0/results?outcome=PASSED")
-        data = json.loads(r.data)
+    @pytest.mark.parametrize("outcomes, count", (("PASSED", 1), ("PASSED,FAILED", 2)))
+    def test_get_results_by_outcome(self, created_result, outcomes, count):
+        self.seed_result(outcome="FAILED")
 
-        assert r.status_code == 200
-        assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
-
-        r = self.app.get("/api/v2.0/results?outcome=PASSED,FAILED")
+        r = self.app.get("/api/v2.0/results?outcome=" + outcomes)
         data = json.loads(r.data)
 
         assert r.status_code == 200
-        assert len(data["data"]) == 2
+        assert len(data["data"]) == count
+        if count == 1:
+            self.assert_ref_result(data["data"][0])
 
-    def test_get_results_sorting_by_submit_time(self):
+    def test_get_results_sorting_by_submit_time(self, created_group, created_testcase):
         name1 = "aa_fake." + self.ref_testcase_name
-        self.helper_create_testcase(name=name1)
+        self.seed_testcase(name=name1)
 
-        self.test_create_result()
-        self.helper_create_result(testcase=name1)
+        # Explicit submit times do not depend on the clock resolution.
+        self.seed_result(submit_time=datetime.datetime(2022, 8, 24, 6, 54, 1))
+        self.seed_result(testcase=name1, submit_time=datetime.datetime(2022, 8, 24, 6, 54, 2))
 
         r1 = self.app.get("/api/v2.0/results?_sort=desc:submit_time")
         data1 = json.loads(r1.data)
@@ -857,8 +1109,7 @@ class TestFuncApiV20(TestCase):
         assert data2["data"][0]["testcase"]["name"] == self.ref_testcase_name
         assert data2["data"][1]["testcase"]["name"] == name1
 
-    def test_get_results_by_since(self):
-        self.test_create_result()
+    def test_get_results_by_since(self, created_result):
         before1 = (datetime.datetime.utcnow() - datetime.timedelta(seconds=100)).isoformat()
         before2 = (datetime.datetime.utcnow() - datetime.timedelta(seconds=99)).isoformat()
         after = (datetime.datetime.utcnow() + datetime.timedelta(seconds=100)).isoformat()
@@ -867,13 +1118,13 @@ class TestFuncApiV20(TestCase):
         data = json.loads(r.data)
         assert r.status_code == 200
         assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
+        self.assert_ref_result(data["data"][0])
 
         r = self.app.get("/api/v2.0/results?since=%s,%s" % (before1, after))
         data = json.loads(r.data)
         assert r.status_code == 200
         assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
+        self.assert_ref_result(data["data"][0])
 
         r = self.app.get("/api/v2.0/results?since=%s" % (after))
         data = json.loads(r.data)
@@ -885,231 +1136,253 @@ class TestFuncApiV20(TestCase):
         assert r.status_code == 200
         assert len(data["data"]) == 0
 
-    def test_get_results_by_result_data(self):
-        self.test_create_result()
-
-        r = self.app.get("/api/v2.0/results?item=perl-Specio-0.25-1.fc26")
-        data = json.loads(r.data)
-        assert r.status_code == 200
-        assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
-
-        r = self.app.get("/api/v2.0/results?item=perl-Specio-0.25-1.fc26&moo=boo,woof")
+    @pytest.mark.parametrize(
+        "query",
+        (
+            "item=perl-Specio-0.25-1.fc26",
+            "item=perl-Specio-0.25-1.fc26&moo=boo,woof",
+            "item=perl-Specio-0.25-1.fc26&moo=boo,fake",
+            "moo:like=*oo*",
+            "moo:like=*fake*,*oo*",
+        ),
+    )
+    def test_get_results_by_result_data(self, created_result, query):
+        r = self.app.get("/api/v2.0/results?" + query)
         data = json.loads(r.data)
         assert r.status_code == 200
         assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
+        self.assert_ref_result(data["data"][0])
 
-        r = self.app.get("/api/v2.0/results?item=perl-Specio-0.25-1.fc26&moo=boo,fake")
-        data = json.loads(r.data)
-        assert r.status_code == 200
-        assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
-
-        r = self.app.get("/api/v2.0/results?moo:like=*oo*")
-        data = json.loads(r.data)
-        assert r.status_code == 200
-        assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
-
-        r = self.app.get("/api/v2.0/results?moo:like=*fake*,*oo*")
-        data = json.loads(r.data)
-        assert r.status_code == 200
-        assert len(data["data"]) == 1
-        assert data["data"][0] == self.ref_result
+    @pytest.fixture(params=(False, True), ids=("group_by", "loose_index_scan"))
+    def loose_index_scan(self, request, monkeypatch):
+        monkeypatch.setitem(app.config, "USE_LOOSE_INDEX_SCAN", request.param)
 
+    @pytest.mark.usefixtures("loose_index_scan")
     def test_get_results_latest(self):
         self.helper_create_testcase()
         self.helper_create_testcase(name=self.ref_testcase_name + ".1")
         self.helper_create_testcase(name=self.ref_testcase_name + ".2")
 
-        self.helper_create_result(outcome="PASSED")
-        r = self.app.get("/api/v2.0/results/latest")
-        data = json.loads(r.data)
-
-        assert len(data["data"]) == 1
-
-        self.helper_create_result(outcome="FAILED")
-        r = self.app.get("/api/v2.0/results/latest")
+        self.helper_create_results([{"outcome": "PASSED"}])
+        r = self.app.get(self.LATEST_URL)
         data = json.loads(r.data)
 
-        assert len(data["data"]) == 1
-        assert data["data"][0]["outcome"] == "FAILED"
+        results = [(x["testcase"]["name"], x["outcome"]) for x in data["data"]]
+        assert results == [(self.ref_testcase_name, "PASSED")]
 
-        self.helper_create_result(testcase=self.ref_testcase_name + ".1")
-        r = self.app.get("/api/v2.0/results/latest")
+        self.helper_create_results([{"outcome": "FAILED"}])
+        r = self.app.get(self.LATEST_URL)
         data = json.loads(r.data)
 
-        assert len(data["data"]) == 2
-        assert data["data"][0]["testcase"]["name"] == self.ref_testcase_name + ".1"
-        assert data["data"][1]["testcase"]["name"] == self.ref_testcase_name
-        assert data["data"][1]["outcome"] == "FAILED"
-
-    def test_get_results_latest_modifiers(self):
-        self.helper_create_testcase()
-        self.helper_create_testcase(name=self.ref_testcase_name + ".1")
-        self.helper_create_testcase(name=self.ref_testcase_name + ".2")
-
-        self.helper_create_result(outcome="PASSED")
-        self.helper_create_result(outcome="FAILED")
-        self.helper_create_result(testcase=self.ref_testcase_name + ".1", outcome="PASSED")
-        self.helper_create_result(
-            testcase=self.ref_testcase_name + ".1", groups=["foobargroup"], outcome="FAILED"
-        )
+        results = [(x["testcase"]["name"], x["outcome"]) for x in data["data"]]
+        assert results == [(self.ref_testcase_name, "FAILED")]
 
-        r = self.app.get("/api/v2.0/results/latest?testcases=%s" % self.ref_testcase_name)
+        self.helper_create_results([{"testcase": self.ref_testcase_name + ".1"}])
+        r = self.app.get(self.LATEST_URL)
         data = json.loads(r.data)
 
-        assert len(data["data"]) == 1
-        assert data["data"][0]["testcase"]["name"] == self.ref_testcase_name
-        assert data["data"][0]["outcome"] == "FAILED"
+        results = [(x["testcase"]["name"], x["outcome"]) for x in data["data"]]
+        assert results == [
+            (self.ref_testcase_name + ".1", self.ref_result_outcome),
+            (self.ref_testcase_name, "FAILED"),
+        ]
 
-        r = self.app.get(
-            "/api/v2.0/results/latest?testcases=%s,%s"
-            % (self.ref_testcase_name, self.ref_testcase_name + ".1")
+    @pytest.mark.parametrize(
+        "query, expected",
+        (
+            ("testcases={testcase}", [("", "FAILED")]),
+            ("testcases={testcase},{testcase}.1", [(".1", "FAILED"), ("", "FAILED")]),
+            ("testcases:like=*", [(".1", "FAILED"), ("", "FAILED")]),
+            ("groups={group}", [(".1", "PASSED"), ("", "FAILED")]),
+        ),
+    )
+    @pytest.mark.usefixtures("loose_index_scan")
+    def test_get_results_latest_modifiers(self, query, expected):
+        self.seed_testcase()
+        self.seed_testcase(name=self.ref_testcase_name + ".1")
+        self.seed_testcase(name=self.ref_testcase_name + ".2")
+
+        self.helper_create_results(
+            [
+                {"outcome": "PASSED"},
+                {"outcome": "FAILED"},
+                {"testcase": self.ref_testcase_name + ".1", "outcome": "PASSED"},
+                {
+                    "testcase": self.ref_testcase_name + ".1",
+                    "groups": ["foobargroup"],
+                    "outcome": "FAILED",
+                },
+            ]
         )
-        data = json.loads(r.data)
-
-        assert len(data["data"]) == 2
-        assert data["data"][0]["testcase"]["name"] == self.ref_testcase_name + ".1"
-        assert data["data"][0]["outcome"] == "FAILED"
-        assert data["data"][1]["testcase"]["name"] == self.ref_testcase_name
-        assert data["data"][1]["outcome"] == "FAILED"
 
-        r = self.app.get("/api/v2.0/results/latest?testcases:like=*")
+        query = query.format(testcase=self.ref_testcase_name, group=self.ref_group_uuid)
+        r = self.app.get(self.LATEST_URL + "?_fields=outcome,testcase.name&" + query)
         data = json.loads(r.data)
 
-        assert len(data["data"]) == 2
-        assert data["data"][0]["testcase"]["name"] == self.ref_testcase_name + ".1"
-        assert data["data"][0]["outcome"] == "FAILED"
-        assert data["data"][1]["testcase"]["name"] == self.ref_testcase_name
-        assert data["data"][1]["outcome"] == "FAILED"
-
-        r = self.app.get("/api/v2.0/results/latest?groups=%s" % self.ref_group_uuid)
-        data = json.loads(r.data)
-
-        assert len(data["data"]) == 2
-        assert data["data"][0]["testcase"]["name"] == self.ref_testcase_name + ".1"
-        assert data["data"][0]["outcome"] == "PASSED"
-        assert data["data"][1]["testcase"]["name"] == self.ref_testcase_name
-        assert data["data"][1]["outcome"] == "FAILED"
+        assert r.status_code == 200, r.text
+        results = [(x["testcase"]["name"], x["outcome"]) for x in data["data"]]
+        assert results == [
+            (self.ref_testcase_name + suffix, outcome) for suffix, outcome in expected
+        ]
 
+    @pytest.mark.postgres
     def test_get_results_latest_distinct_on(self):
-        """This test requires PostgreSQL, because DISTINCT ON does work differently in SQLite"""
-        self.require_postgres()
-
         self.helper_create_testcase()
 
-        self.helper_create_result(
-            outcome="PASSED", data={"scenario": "scenario1"}, testcase=self.ref_testcase_name
-        )
-        self.helper_create_result(
-            outcome="FAILED", data={"scenario": "scenario2"}, testcase=self.ref_testcase_name
+        self.helper_create_results(
+            [
+                {
+                    "outcome": "PASSED",
+                    "data": {"scenario": "scenario1"},
+                    "testcase": self.ref_testcase_name,
+                },
+                {
+                    "outcome": "FAILED",
+                    "data": {"scenario": "scenario2"},
+                    "testcase": self.ref_testcase_name,
+                },
+            ]
         )
 
-        r = self.app.get(
-            "/api/v2.0/results/latest?testcases="
-            + self.ref_testcase_name
-            + "&_distinct_on=scenario"
-        )
+        r = self.app.get(self.TESTCASE_LATEST_URL + "&_distinct_on=scenario")
         data = json.loads(r.data)
-        assert len(data["data"]) == 2
-        assert data["data"][0]["data"]["scenario"][0] == "scenario2"
-        assert data["data"][1]["data"]["scenario"][0] == "scenario1"
+        results = [(x["outcome"], x["data"]["scenario"]) for x in data["data"]]
+        assert results == [("FAILED", ["scenario2"]), ("PASSED", ["scenario1"])]
 
-        r = self.app.get("/api/v2.0/results/latest?testcases=" + self.ref_testcase_name)
+        r = self.app.get(self.TESTCASE_LATEST_URL)
         data = json.loads(r.data)
-        assert len(data["data"]) == 1
-        assert data["data"][0]["data"]["scenario"][0] == "scenario2"
+        results = [(x["outcome"], x["data"]["scenario"]) for x in data["data"]]
+        assert results == [("FAILED", ["scenario2"])]
 
+    @pytest.mark.postgres
     def test_get_results_latest_distinct_on_more_specific_cases_1(self):
-        """This test requires PostgreSQL, because DISTINCT ON does work differently in SQLite"""
-        self.require_postgres()
-
         """
-            | id | testcase | scenario |
-            |----|----------|----------|
-            | 1  | tc_1     | s_1      |
-            | 2  | tc_2     | s_1      |
-            | 3  | tc_2     | s_2      |
-            | 4  | tc_3     |          |
+        | id | testcase | scenario |
+        |----|----------|----------|
+        | 1  | tc_1     | s_1      |
+        | 2  | tc_2     | s_1      |
+        | 3  | tc_2     | s_2      |
+        | 4  | tc_3     |          |
         """
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_1", data={"item": "grub", "scenario": "s_1"}
-        )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_1"}
-        )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_2"}
+        self.helper_create_results(
+            [
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_1",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_2"},
+                },
+                {"outcome": "PASSED", "testcase": "tc_3", "data": {"item": "grub"}},
+            ]
         )
-        self.helper_create_result(outcome="PASSED", testcase="tc_3", data={"item": "grub"})
 
-        r = self.app.get("/api/v2.0/results/latest?item=grub&_distinct_on=scenario")
+        r = self.app.get(
+            (
+                self.LATEST_URL + "?item=grub&_distinct_on=scenario"
+                "&_fields=outcome,testcase.name,data.scenario"
+            )
+        )
         data = json.loads(r.data)
 
         assert len(data["data"]) == 4
 
+    @pytest.mark.postgres
     def test_get_results_latest_distinct_on_more_specific_cases_2(self):
-        """This test requires PostgreSQL, because DISTINCT ON does work differently in SQLite"""
-        self.require_postgres()
-
         """
-            | id | testcase | scenario |
-            |----|----------|----------|
-            | 1  | tc_1     | s_1      |
-            | 2  | tc_2     | s_1      |
-            | 3  | tc_2     | s_2      |
-            | 4  | tc_3     |          |
-            | 5  | tc_1     |          |
+        | id | testcase | scenario |
+        |----|----------|----------|
+        | 1  | tc_1     | s_1      |
+        | 2  | tc_2     | s_1      |
+        | 3  | tc_2     | s_2      |
+        | 4  | tc_3     |          |
+        | 5  | tc_1     |          |
         """
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_1", data={"item": "grub", "scenario": "s_1"}
+        self.helper_create_results(
+            [
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_1",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_2"},
+                },
+                {"outcome": "PASSED", "testcase": "tc_3", "data": {"item": "grub"}},
+                {"outcome": "FAILED", "testcase": "tc_1", "data": {"item": "grub"}},
+            ]
         )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_1"}
-        )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_2"}
-        )
-        self.helper_create_result(outcome="PASSED", testcase="tc_3", data={"item": "grub"})
-        self.helper_create_result(outcome="FAILED", testcase="tc_1", data={"item": "grub"})
 
-        r = self.app.get("/api/v2.0/results/latest?item=grub&_distinct_on=scenario")
+        r = self.app.get(
+            (
+                self.LATEST_URL + "?item=grub&_distinct_on=scenario"
+                "&_fields=outcome,testcase.name,data.scenario"
+            )
+        )
         data = json.loads(r.data)
 
         assert len(data["data"]) == 5
 
+    @pytest.mark.postgres
     def test_get_results_latest_distinct_on_more_specific_cases_3(self):
-        """This test requires PostgreSQL, because DISTINCT ON does work differently in SQLite"""
-        self.require_postgres()
-
         """
-            | id | testcase | scenario |
-            |----|----------|----------|
-            | 1  | tc_1     | s_1      |
-            | 2  | tc_2     | s_1      |
-            | 3  | tc_2     | s_2      |
-            | 4  | tc_3     |          |
-            | 5  | tc_1     |          |
-            | 6  | tc_1     | s_1      |
+        | id | testcase | scenario |
+        |----|----------|----------|
+        | 1  | tc_1     | s_1      |
+        | 2  | tc_2     | s_1      |
+        | 3  | tc_2     | s_2      |
+        | 4  | tc_3     |          |
+        | 5  | tc_1     |          |
+        | 6  | tc_1     | s_1      |
         """
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_1", data={"item": "grub", "scenario": "s_1"}
-        )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_1"}
-        )
-        self.helper_create_result(
-            outcome="PASSED", testcase="tc_2", data={"item": "grub", "scenario": "s_2"}
-        )
-        self.helper_create_result(outcome="PASSED", testcase="tc_3", data={"item": "grub"})
-        self.helper_create_result(outcome="FAILED", testcase="tc_1", data={"item": "grub"})
-        self.helper_create_result(
-            outcome="INFO", testcase="tc_1", data={"item": "grub", "scenario": "s_1"}
+        self.helper_create_results(
+            [
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_1",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+                {
+                    "outcome": "PASSED",
+                    "testcase": "tc_2",
+                    "data": {"item": "grub", "scenario": "s_2"},
+                },
+                {"outcome": "PASSED", "testcase": "tc_3", "data": {"item": "grub"}},
+                {"outcome": "FAILED", "testcase": "tc_1", "data": {"item": "grub"}},
+                {
+                    "outcome": "INFO",
+                    "testcase": "tc_1",
+                    "data": {"item": "grub", "scenario": "s_1"},
+                },
+            ]
         )
 
-        r = self.app.get("/api/v2.0/results/latest?item=grub&_distinct_on=scenario")
+        r = self.app.get(
+            (
+                self.LATEST_URL + "?item=grub&_distinct_on=scenario"
+                "&_fields=outcome,testcase.name,data.scenario"
+            )
+        )
         data = json.loads(r.data)
 
         items = [
@@ -1128,33 +1401,245 @@ class TestFuncApiV20(TestCase):
             ("s_1", "tc_2", "PASSED"),
         ]
 
+    @pytest.mark.postgres
     def test_get_results_latest_distinct_on_with_scenario_not_defined(self):
-        """This test requires PostgreSQL, because DISTINCT ON does work differently in SQLite"""
-        self.require_postgres()
-
         self.helper_create_testcase()
-        self.helper_create_result(outcome="PASSED", testcase=self.ref_testcase_name)
-        self.helper_create_result(outcome="FAILED", testcase=self.ref_testcase_name)
+        self.helper_create_results(
+            [
+                {"outcome": "PASSED", "testcase": self.ref_testcase_name},
+                {"outcome": "FAILED", "testcase": self.ref_testcase_name},
+            ]
+        )
+
+        r = self.app.get(self.TESTCASE_LATEST_URL + "&_distinct_on=scenario&_fields=outcome")
+        data = json.loads(r.data)
+
+        assert data["data"] == [{"outcome": "FAILED"}]
+
+    def test_get_results_latest_fields(self, created_result):
+        r = self.app.get(self.LATEST_URL + "?_fields=id,outcome,testcase.name,data.item,data.fake")
+        data = json.loads(r.data)
+
+        assert r.status_code == 200, r.text
+        assert data["data"] == [
+            {
+                "id": self.ref_result_id,
+                "outcome": self.ref_result_outcome,
+                "testcase": {"name": self.ref_testcase_name},
+                "data": {"item": [self.ref_result_item]},
+            }
+        ]
+
+        r = self.app.get(self.LATEST_URL + "?_fields=testcase,groups,submit_time,data")
+        data = json.loads(r.data)
+
+        assert r.status_code == 200, r.text
+        assert data["data"] == [
+            {
+                key: value
+                for key, value in self.ref_result.items()
+                if key in ("testcase", "groups", "submit_time", "data")
+            }
+        ]
+
+    @pytest.mark.parametrize(
+        "testcases, testcases_like, expected",
+        (
+            (None, None, ["tc_a", "tc_b.1", "tc_b.2", "tc_c", "tc_unrelated"]),
+            (["tc_b.1", "tc_c", "tc_missing"], None, ["tc_b.1", "tc_c"]),
+            (None, ["tc_b.*"], ["tc_b.1", "tc_b.2"]),
+            (["tc_a"], ["tc_b.*"], ["tc_a", "tc_b.1", "tc_b.2"]),
+        ),
+    )
+    def test_latest_testcase_names(self, testcases, testcases_like, expected):
+        """The loose index scan visits only the requested test case names."""
+        self.helper_create_results(
+            [
+                {"testcase": name}
+                for name in ("tc_c", "tc_a", "tc_b.2", "tc_b.1", "tc_a", "tc_unrelated")
+            ]
+        )
+
+        names = api_v2.latest_testcase_names(testcases, testcases_like)
+        visited = db.session.execute(select(names.c.name)).scalars().all()
+        assert visited == expected + [None]
+
+    @pytest.mark.usefixtures("loose_index_scan")
+    def test_get_results_latest_eager_loading(self):
+        self.helper_create_results(
+            [
+                {"testcase": self.ref_testcase_name + suffix, "groups": [self.ref_group_uuid]}
+                for suffix in ("", ".1", ".2")
+            ]
+        )
+
+        statements = []
+
+        def on_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, "before_cursor_execute", on_execute)
+        try:
+            r = self.app.get(self.LATEST_URL)
+        finally:
+            event.remove(db.engine, "before_cursor_execute", on_execute)
+
+        assert r.status_code == 200, r.text
+        assert len(r.json["data"]) == 3
+        # Results with test cases, then result data and groups
+        selects = [
+            s for s in statements if s.startswith(("SELECT", "WITH")) and "FROM sessions" not in s
+        ]
+        assert len(selects) == 3, selects
+
+    def test_get_results_latest_cached(self, monkeypatch):
+        monkeypatch.setitem(app.config, "RESULTS_LATEST_CACHE_TTL", 60)
+        app.extensions.pop("api_v2_results_latest", None)
+        self.helper_create_results([{"outcome": "PASSED"}])
+
+        r = self.app.get(self.TESTCASE_LATEST_URL)
+        assert r.status_code == 200, r.text
+        assert [x["outcome"] for x in r.json["data"]] == ["PASSED"]
+
+        with patch("resultsdb.controllers.api_v2.select_latest_results") as select:
+            r2 = self.app.get(self.TESTCASE_LATEST_URL)
+        select.assert_not_called()
+        assert r2.data == r.data
+
+        # New results invalidate the cache.
+        self.helper_create_results([{"outcome": "FAILED"}])
+        r = self.app.get(self.TESTCASE_LATEST_URL)
+        assert [x["outcome"] for x in r.json["data"]] == ["FAILED"]
+
+    def test_get_results_latest_cached_lower_id_committed_later(self, monkeypatch):
+        monkeypatch.setitem(app.config, "RESULTS_LATEST_CACHE_TTL", 60)
+        clock = [0]
+        app.extensions["api_v2_results_latest"] = TTLCache(
+            maxsize=256, ttl=60, timer=lambda: clock[0]
+        )
+        self.seed_testcase()
+        now = datetime.datetime.utcnow()
+
+        def insert_result(result_id, outcome, submit_time):
+            db.session.execute(
+                Result.__table__.insert().values(
+                    id=result_id,
+                    testcase_name=self.ref_testcase_name,
+                    outcome=outcome,
+                    submit_time=submit_time,
+                )
+            )
+            db.session.commit()
+
+        insert_result(10, "PASSED", now - datetime.timedelta(seconds=1))
+        r = self.app.get(self.TESTCASE_LATEST_URL)
+        assert [(x["id"], x["outcome"]) for x in r.json["data"]] == [(10, "PASSED")]
+
+        # The newest id does not change, like for a result with an id reserved
+        # before the cached read and committed after it. The result shows up
+        # once the cached response expires.
+        insert_result(5, "FAILED", now)
+        r = self.app.get(self.TESTCASE_LATEST_URL)
+        assert [(x["id"], x["outcome"]) for x in r.json["data"]] == [(10, "PASSED")]
+
+        clock[0] = 60
+        r = self.app.get(self.TESTCASE_LATEST_URL)
+        assert [(x["id"], x["outcome"]) for x in r.json["data"]] == [(5, "FAILED")]
+
+    def test_get_results_latest_cached_per_host(self, monkeypatch, created_result):
+        monkeypatch.setitem(app.config, "RESULTS_LATEST_CACHE_TTL", 60)
+        app.extensions.pop("api_v2_results_latest", None)
+
+        r1 = self.app.get(self.TESTCASE_LATEST_URL, base_url="http://resultsdb1.example.com")
+        r2 = self.app.get(self.TESTCASE_LATEST_URL, base_url="http://resultsdb2.example.com")
+        assert r1.json["data"][0]["href"].startswith("http://resultsdb1.example.com/")
+        assert r2.json["data"][0]["href"].startswith("http://resultsdb2.example.com/")
+
+    @pytest.mark.parametrize("fields", ("outcome,fake", "outcome,data."))
+    def test_get_results_latest_invalid_fields(self, fields):
+        r = self.app.get(self.LATEST_URL + "?_fields=" + fields)
+        data = json.loads(r.data)
+
+        assert r.status_code == 400
+        assert data["validation_error"]["query_params"][0]["loc"] == ["_fields"]
+
+    @pytest.mark.parametrize(
+        "url",
+        (
+            "/api/v2.0/results",
+            "/api/v2.0/groups/{group}/results",
+            "/api/v2.0/testcases/{testcase}/results",
+        ),
+    )
+    def test_get_results_fields(self, created_result, url):
+        url = url.format(group=self.ref_group_uuid, testcase=self.ref_testcase_name)
+        r = self.app.get(url + "?_fields=id,outcome,testcase.name,data.item")
+        data = json.loads(r.data)
+
+        assert r.status_code == 200, r.text
+        assert data["data"] == [
+            {
+                "id": self.ref_result_id,
+                "outcome": self.ref_result_outcome,
+                "testcase": {"name": self.ref_testcase_name},
+                "data": {"item": [self.ref_result_item]},
+            }
+        ]
+
+    @pytest.mark.postgres
+    def test_get_results_latest_distinct_on_filtered_key(self):
+        self.helper_create_results(
+            [
+                {"outcome": "PASSED", "data": {"scenario": "s_1"}},
+                {"outcome": "FAILED", "data": {"scenario": "s_2"}},
+                {"outcome": "INFO", "data": {"scenario": "s_1"}},
+                {"outcome": "FAILED", "data": {"scenario": "s_2"}},
+            ]
+        )
 
         r = self.app.get(
-            "/api/v2.0/results/latest?testcases="
-            + self.ref_testcase_name
-            + "&_distinct_on=scenario"
+            self.TESTCASE_LATEST_URL
+            + "&scenario=s_1&_distinct_on=scenario&_fields=outcome,data.scenario"
         )
         data = json.loads(r.data)
 
-        assert len(data["data"]) == 1
-        assert data["data"][0]["outcome"] == "FAILED"
+        assert r.status_code == 200, r.text
+        assert data["data"] == [{"outcome": "INFO", "data": {"scenario": ["s_1"]}}]
+
+    @pytest.mark.postgres
+    def test_get_results_latest_distinct_on_filtered_multi_valued_key(self):
+        """
+        A result with more values for a key is distinct for each of the values
+        even if the key is filtered to a single value.
+        """
+        self.helper_create_results(
+            [
+                {"outcome": "PASSED", "data": {"scenario": ["s_1", "s_2"]}},
+                {"outcome": "FAILED", "data": {"scenario": "s_1"}},
+            ]
+        )
+
+        r = self.app.get(
+            self.TESTCASE_LATEST_URL
+            + "&scenario=s_1&_distinct_on=scenario&_fields=outcome,data.scenario"
+        )
+        data = json.loads(r.data)
+
+        assert r.status_code == 200, r.text
+        assert data["data"] == [
+            {"outcome": "FAILED", "data": {"scenario": ["s_1"]}},
+            {"outcome": "PASSED", "data": {"scenario": ["s_1", "s_2"]}},
+        ]
 
     def test_get_results_latest_distinct_on_wrong_params(self):
-        r = self.app.get("/api/v2.0/results/latest?_distinct_on=scenario")
+        r = self.app.get(self.LATEST_URL + "?_distinct_on=scenario")
         data = json.loads(r.data)
         assert r.status_code == 400
         assert data["message"] == "Please, provide at least one filter beside '_distinct_on'"
 
-    def test_message_publication(self):
-        self.helper_create_result()
+    def test_message_publication(self, clean_message_history):
         plugin = resultsdb.messaging.DummyPlugin
+        self.helper_create_result()
         assert len(plugin.history) == 1, plugin.history
         assert plugin.history[0]["data"]["item"] == [self.ref_result_item]
         assert plugin.history[0]["data"]["type"] == [self.ref_result_type]
@@ -1165,6 +1650,20 @@ class TestFuncApiV20(TestCase):
         assert plugin.history[0]["note"] == self.ref_result_note
         assert plugin.history[0]["testcase"]["name"] == self.ref_testcase_name
 
+    def test_message_modified_by_plugin(self, clean_message_history):
+        def publish(message):
+            message["outcome"] = "CHANGED"
+            message["data"]["item"].append("changed")
+
+        with patch("resultsdb.controllers.common.load_messaging_plugin") as load_plugin:
+            load_plugin.return_value.publish.side_effect = publish
+            r, data = self.helper_create_result()
+
+        assert r.status_code == 201, r.text
+        load_plugin.return_value.publish.assert_called_once()
+        assert data["outcome"] == self.ref_result_outcome
+        assert data["data"]["item"] == [self.ref_result_item]
+
     def test_get_outcomes_on_landing_page(self):
         r = self.app.get("/api/v2.0/")
         data = json.loads(r.data)
@@ -1178,7 +1677,18 @@ class TestFuncApiV20(TestCase):
         data = json.loads(r.data)
         assert data.get("message") == "Health check OK"
 
+    def test_healthcheck_cached(self):
+        api_v2._healthcheck_cache.clear()
+        r = self.app.get("/api/v2.0/healthcheck")
+        assert r.status_code == 200
+
+        with patch("resultsdb.controllers.api_v2.db") as db:
+            r = self.app.get("/api/v2.0/healthcheck")
+        assert r.status_code == 200
+        db.session.execute.assert_not_called()
+
     def test_healthcheck_fail(self):
+        api_v2._healthcheck_cache.clear()
         with patch("resultsdb.controllers.api_v2.db") as db:
             db.session.execute.side_effect = RuntimeError("Testing DB outage")
             r = self.app.get("/api/v2.0/healthcheck")
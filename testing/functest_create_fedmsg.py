@@ -18,7 +18,6 @@
 #   Josef Skladanka <jskladan@redhat.com>
 
 import json
-import datetime
 import copy
 
 from flask import current_app as app
@@ -45,19 +44,15 @@ class MyResult(object):
         ]
 
 
-class AboutTime(object):
-    def __eq__(self, value):
-        start = (datetime.datetime.utcnow() - datetime.timedelta(seconds=10)).isoformat()
-        stop = (datetime.datetime.utcnow() + datetime.timedelta(seconds=10)).isoformat()
-        return start <= value <= stop
-
-
 class TestFuncCreateFedmsg:
+    @classmethod
+    def setup_class(cls):
+        cls.app = app.test_client()
+
     def setup_method(self, method):
         db.session.rollback()
         db.drop_all()
         db.create_all()
-        self.app = app.test_client()
         self.ref_url_prefix = "http://localhost/api/v2.0"
 
         # Testcase data
@@ -90,7 +85,7 @@ class TestFuncCreateFedmsg:
 
     def teardown_method(self, method):
         # Reset this for each test.
-        resultsdb.messaging.DummyPlugin.history = []
+        resultsdb.messaging.DummyPlugin.history.clear()
 
     def helper_create_result(self, outcome=None, groups=None, testcase=None, data=None):
         if outcome is None:
@@ -0,0 +1,15 @@
+# SPDX-License-Identifier: GPL-2.0+
+import datetime
+
+
+def within_seconds(value, seconds):
+    """Returns True if the ISO 8601 time is at most the given seconds from now."""
+    delta = datetime.datetime.fromisoformat(value) - datetime.datetime.utcnow()
+    return abs(delta.total_seconds()) <= seconds
+
+
+class AboutTime(object):
+    """Compares equal to ISO 8601 times close to the current time."""
+
+    def __eq__(self, value):
+        return within_seconds(value, 10)
@@ -2,8 +2,12 @@
 from unittest.mock import ANY, patch, Mock
 
 import pytest
+from sqlalchemy import event
 
+from resultsdb.authorization import _ldap_groups_cache
+from resultsdb.controllers.api_v3 import get_testcase
 from resultsdb.models import db
+from resultsdb.models.results import Testcase
 from resultsdb.parsers.api_v3 import RESULTS_PARAMS_CLASSES
 
 
@@ -16,6 +20,7 @@ def db_session():
 
 @pytest.fixture(autouse=True)
 def mock_ldap():
+    _ldap_groups_cache.clear()
     with patch("ldap.initialize") as ldap_init:
         con = Mock()
         con.search_s.return_value = [("ou=Groups,dc=example,dc=com", {"cn": [b"testgroup1"]})]
@@ -23,14 +28,16 @@ def mock_ldap():
         yield con
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def client(app):
     return app.test_client()
 
 
 @pytest.fixture
 def permissions(app):
-    with patch.dict(app.config, {"PERMISSIONS": []}):
+    with patch.dict(app.config, {"PERMISSIONS": []}), patch.dict(app.extensions):
+        # Permissions are stored again on first use
+        app.extensions.pop("resultsdb_permissions", None)
         yield app.config["PERMISSIONS"]
 
 
@@ -63,24 +70,39 @@ def test_api_v3_documentation(client):
     assert 'response = session.get("http://localhost/auth/oidclogin")' in r.text, r.text
 
 
+def test_api_v3_documentation_cached(client):
+    r = client.get("/api/v3/")
+    assert r.status_code == 200, r.text
+    assert r.cache_control.public
+    assert r.cache_control.max_age == 300
+
+    r2 = client.get("/api/v3/")
+    assert r2.text == r.text
+
+    r3 = client.get("/api/v3/", headers={"X-Forwarded-Host": "resultsdb.example.com"})
+    assert r3.status_code == 200, r3.text
+    assert "http://resultsdb.example.com/api/v3/results/brew-builds" in r3.text, r3.text
+
+
 def test_api_v3_create_brew_build(client):
     data = brew_build_request_data()
     r = client.post("/api/v3/results/brew-builds", json=data)
     assert r.status_code == 201, r.text
-    assert r.json["data"]["username"] == ["testuser1"]
-    assert r.json["testcase"] == {
+    result = r.json
+    assert result["data"]["username"] == ["testuser1"]
+    assert result["testcase"] == {
         "href": "http://localhost/api/v2.0/testcases/testcase1",
         "name": "testcase1",
         "ref_url": None,
     }
-    assert r.json["outcome"] == data["outcome"]
-    assert r.json["data"]["type"] == ["brew-build"]
-    assert r.json["data"]["item"] == [data["item"]]
-    assert r.json["data"]["ci_name"] == [data["ci_name"]]
-    assert r.json["data"]["ci_team"] == [data["ci_team"]]
-    assert r.json["data"]["ci_docs"] == [data["ci_docs"]]
-    assert r.json["data"]["ci_email"] == [data["ci_email"]]
-    assert r.json["data"]["brew_task_id"] == [str(data["brew_task_id"])]
+    assert result["outcome"] == data["outcome"]
+    assert result["data"]["type"] == ["brew-build"]
+    assert result["data"]["item"] == [data["item"]]
+    assert result["data"]["ci_name"] == [data["ci_name"]]
+    assert result["data"]["ci_team"] == [data["ci_team"]]
+    assert result["data"]["ci_docs"] == [data["ci_docs"]]
+    assert result["data"]["ci_email"] == [data["ci_email"]]
+    assert result["data"]["brew_task_id"] == [str(data["brew_task_id"])]
 
 
 def test_api_v3_create_brew_build_full(client):
@@ -99,20 +121,73 @@ def test_api_v3_create_brew_build_full(client):
     )
     r = client.post("/api/v3/results/brew-builds", json=data)
     assert r.status_code == 201, r.text
-    assert r.json["testcase"] == {
+    result = r.json
+    assert result["testcase"] == {
         "href": "http://localhost/api/v2.0/testcases/testcase1",
         "name": "testcase1",
         "ref_url": "https://test.example.com/docs/testcase1",
     }
-    assert r.json["data"]["error_reason"] == [data["error_reason"]]
-    assert r.json["data"]["issue_url"] == [data["issue_url"]]
-    assert r.json["data"]["system_provider"] == [data["system_provider"]]
-    assert r.json["data"]["system_architecture"] == [data["system_architecture"]]
-    assert r.json["data"]["system_variant"] == [data["system_variant"]]
-    assert r.json["data"]["ci_url"] == [data["ci_url"]]
-    assert r.json["data"]["ci_irc"] == [data["ci_irc"]]
-    assert r.json["data"]["rebuild"] == [data["rebuild"]]
-    assert r.json["data"]["log"] == [data["log"]]
+    assert result["data"]["error_reason"] == [data["error_reason"]]
+    assert result["data"]["issue_url"] == [data["issue_url"]]
+    assert result["data"]["system_provider"] == [data["system_provider"]]
+    assert result["data"]["system_architecture"] == [data["system_architecture"]]
+    assert result["data"]["system_variant"] == [data["system_variant"]]
+    assert result["data"]["ci_url"] == [data["ci_url"]]
+    assert result["data"]["ci_irc"] == [data["ci_irc"]]
+    assert result["data"]["rebuild"] == [data["rebuild"]]
+    assert result["data"]["log"] == [data["log"]]
+
+
+def test_api_v3_create_result_data_single_insert(client):
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    try:
+        r = client.post("/api/v3/results/brew-builds", json=brew_build_request_data())
+    finally:
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    assert r.status_code == 201, r.text
+    inserts = [s for s in statements if s.startswith("INSERT INTO result_data")]
+    assert len(inserts) == 1, statements
+    inserts = [s for s in statements if s.startswith("INSERT INTO result ")]
+    assert len(inserts) == 1, statements
+    assert r.json["submit_time"], r.text
+
+
+def test_api_v3_create_result_existing_testcase(client):
+    data = brew_build_request_data()
+    r = client.post("/api/v3/results/brew-builds", json=data)
+    assert r.status_code == 201, r.text
+
+    data = brew_build_request_data(testcase_ref_url="https://test.example.com/docs/testcase1")
+    r = client.post("/api/v3/results/brew-builds", json=data)
+    assert r.status_code == 201, r.text
+    assert r.json["testcase"]["ref_url"] == "https://test.example.com/docs/testcase1"
+    assert Testcase.query.count() == 1
+
+
+def test_api_v3_get_testcase_once_per_request(app):
+    db.session.add(Testcase(name="testcase1"))
+    db.session.commit()
+
+    statements = []
+
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", on_execute)
+    try:
+        with app.test_request_context("/api/v3/results/brew-builds", method="POST"):
+            testcase = get_testcase("testcase1")
+            assert get_testcase("testcase1") is testcase
+    finally:
+        event.remove(db.engine, "before_cursor_execute", on_execute)
+
+    assert len(statements) == 1
 
 
 def test_api_v3_create_redhat_container_image(client):
@@ -129,17 +204,18 @@ def test_api_v3_create_redhat_container_image(client):
     )
     r = client.post("/api/v3/results/redhat-container-images", json=data)
     assert r.status_code == 201, r.text
-    assert r.json["testcase"] == {
+    result = r.json
+    assert result["testcase"] == {
         "href": "http://localhost/api/v2.0/testcases/testcase1",
         "name": "testcase1",
         "ref_url": None,
     }
-    assert r.json["data"]["item"] == [data["item"]]
-    assert r.json["data"]["type"] == ["redhat-container-image"]
-    assert r.json["data"]["id"] == [data["id"]]
-    assert r.json["data"]["issuer"] == [data["issuer"]]
-    assert r.json["data"]["component"] == [data["component"]]
-    assert r.json["data"]["full_names"] == data["full_names"]
+    assert result["data"]["item"] == [data["item"]]
+    assert result["data"]["type"] == ["redhat-container-image"]
+    assert result["data"]["id"] == [data["id"]]
+    assert result["data"]["issuer"] == [data["issuer"]]
+    assert result["data"]["component"] == [data["component"]]
+    assert result["data"]["full_names"] == data["full_names"]
 
 
 def test_api_v3_scratch_build(client):
@@ -161,8 +237,9 @@ def test_api_v3_productmd_compose_id_simple(client):
     }
     r = client.post("/api/v3/results/productmd-composes", json=data)
     assert r.status_code == 201, r.text
-    assert r.json["data"]["type"] == ["productmd-compose"]
-    assert r.json["data"]["item"] == [
+    result = r.json
+    assert result["data"]["type"] == ["productmd-compose"]
+    assert result["data"]["item"] == [
         "RHEL-8.8.0-20221129.0/unknown/",
         "RHEL-8.8.0-20221129.0",
     ]
@@ -182,8 +259,9 @@ def test_api_v3_productmd_compose_id_full(client):
     }
     r = client.post("/api/v3/results/productmd-composes", json=data)
     assert r.status_code == 201, r.text
-    assert r.json["data"]["type"] == ["productmd-compose"]
-    assert r.json["data"]["item"] == [
+    result = r.json
+    assert result["data"]["type"] == ["productmd-compose"]
+    assert result["data"]["item"] == [
         "RHEL-8.8.0-20221129.0/Server/x86_64",
         "RHEL-8.8.0-20221129.0",
     ]
@@ -225,6 +303,21 @@ def test_api_v3_permissions_for_testcase_not_matching(client, permissions):
     assert r.json == []
 
 
+def test_api_v3_permissions_for_testcase_exact_and_pattern(client, permissions):
+    exact = {"users": ["testuser1"], "testcases": ["testcase1"]}
+    pattern = {"users": ["testuser2"], "testcases": ["test*"]}
+    other = {"users": ["testuser3"], "testcases": ["testcase2"]}
+    permissions.extend([pattern, other, exact])
+
+    r = client.get("/api/v3/permissions?testcase=testcase1")
+    assert r.status_code == 200, r.text
+    assert r.json == [pattern, exact]
+
+    r = client.get("/api/v3/permissions?testcase=other")
+    assert r.status_code == 200, r.text
+    assert r.json == []
+
+
 def test_api_v3_permission_denied(client, permissions):
     permissions.append(
         {
@@ -267,6 +360,35 @@ def test_api_v3_permission_matches_user_group(client, permissions, mock_ldap):
     )
 
 
+def test_api_v3_permission_user_group_cached(client, permissions, mock_ldap):
+    permissions.append(
+        {
+            "groups": ["testgroup1"],
+            "testcases": ["testcase1*"],
+        }
+    )
+    data = brew_build_request_data()
+    for _ in range(2):
+        r = client.post("/api/v3/results/brew-builds", json=data)
+        assert r.status_code == 201, r.text
+    mock_ldap.search_s.assert_called_once()
+
+
+def test_api_v3_permission_no_groups_found_cached(client, permissions, mock_ldap):
+    permissions.append(
+        {
+            "groups": ["testgroup1"],
+            "testcases": ["testcase1*"],
+        }
+    )
+    mock_ldap.search_s.return_value = []
+    data = brew_build_request_data()
+    for _ in range(2):
+        r = client.post("/api/v3/results/brew-builds", json=data)
+        assert r.status_code == 401, r.text
+    mock_ldap.search_s.assert_called_once()
+
+
 def test_api_v3_permission_no_groups_found(client, permissions, mock_ldap):
     permissions.append(
         {
@@ -281,6 +403,28 @@ def test_api_v3_permission_no_groups_found(client, permissions, mock_ldap):
     assert "Failed to find user testuser1 in LDAP" in r.text
 
 
+def test_api_v3_create_invalid_body(client):
+    data = brew_build_request_data()
+    del data["outcome"]
+    r = client.post("/api/v3/results/brew-builds", json=data)
+    assert r.status_code == 400, r.text
+    assert r.json == {
+        "validation_error": {
+            "body_params": [
+                {
+                    "loc": ["outcome"],
+                    "msg": "field required",
+                    "type": "value_error.missing",
+                }
+            ]
+        }
+    }
+
+    r = client.post("/api/v3/results/brew-builds", json=[data])
+    assert r.status_code == 400, r.text
+    assert r.json["validation_error"]["body_params"][0]["loc"] == ["__root__"]
+
+
 @pytest.mark.parametrize("params_class", RESULTS_PARAMS_CLASSES)
 def test_api_v3_consistency(params_class, client):
     """
@@ -1,8 +1,21 @@
 import datetime
 import ssl
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+from flask.json.provider import DefaultJSONProvider
 
 import resultsdb.controllers.api_v2 as apiv2
+from resultsdb.authorization import (
+    _oidc_token_cache,
+    cache_token_introspection,
+    index_testcase_permissions,
+    match_testcase_permissions,
+)
 import resultsdb.messaging as messaging
+from resultsdb.lib.cache import TTLCache
+from resultsdb.lib.json_provider import OrjsonProvider, orjson
 from resultsdb.parsers.api_v2 import parse_since
 
 
@@ -110,6 +123,27 @@ class TestParseSince:
 
 
 class TestMessaging:
+    def test_load_plugin_scans_entry_points_once(self):
+        point = Mock()
+        point.name = "fake"
+        point.load.return_value = messaging.DummyPlugin
+
+        messaging.messaging_plugin_classes.cache_clear()
+        try:
+            with patch.object(
+                messaging.pkg_resources, "iter_entry_points", return_value=[point]
+            ) as iter_entry_points:
+                plugin1 = messaging.load_messaging_plugin("fake", {"destination": "first"})
+                plugin2 = messaging.load_messaging_plugin("fake", {"destination": "second"})
+        finally:
+            messaging.messaging_plugin_classes.cache_clear()
+
+        iter_entry_points.assert_called_once_with("resultsdb.messaging.plugins")
+        point.load.assert_called_once_with()
+        assert plugin1 is not plugin2
+        assert plugin1.destination == "first"
+        assert plugin2.destination == "second"
+
     def test_load_plugin(self):
         plugin = messaging.load_messaging_plugin("dummy", {})
         assert isinstance(plugin, messaging.DummyPlugin)
@@ -176,6 +210,125 @@ If you ran `python setup.py develop` and are still seeing this error, then:
             }
 
 
+class TestMatchTestcasePermissions:
+    permissions = (
+        {"users": ["user1"], "testcases": ["testcase1"]},
+        {"users": ["user2"], "testcases": ["test*", "other"]},
+        {"users": ["user3"]},
+        {"users": ["user4"], "testcases": ["*case*1*", "testcase[12]"]},
+        {"users": ["user5"], "testcases": ["a.b?c+"]},
+    )
+
+    @pytest.mark.parametrize(
+        "testcase", ("testcase1", "testcase2", "other", "x", "a.bxc+", "abxc", "")
+    )
+    def test_index(self, testcase):
+        index = index_testcase_permissions(self.permissions)
+        expected = list(match_testcase_permissions(testcase, self.permissions))
+        assert list(match_testcase_permissions(testcase, self.permissions, index)) == expected
+
+    def test_order(self):
+        index = index_testcase_permissions(self.permissions)
+        matched = match_testcase_permissions("testcase1", self.permissions, index)
+        assert [p["users"] for p in matched] == [["user1"], ["user2"], ["user4"]]
+
+
+class TestCacheTokenIntrospection:
+    def setup_method(self, method):
+        _oidc_token_cache.clear()
+        self.oidc = Mock()
+        self.introspect_token = self.oidc.introspect_token
+        cache_token_introspection(self.oidc)
+        self.client = Mock()
+
+    def request(self, token):
+        return Mock(headers={"Authorization": f"Bearer {token}"})
+
+    def test_cached(self):
+        self.introspect_token.return_value = {"active": True, "uid": "user1"}
+        result = self.oidc.introspect_token(self.request("token1"), self.client)
+        assert result == {"active": True, "uid": "user1"}
+        assert self.oidc.introspect_token(self.request("token1"), self.client) is result
+        assert self.introspect_token.call_count == 1
+
+        self.oidc.introspect_token(self.request("token2"), self.client)
+        assert self.introspect_token.call_count == 2
+
+    def test_invalid_token_not_cached(self):
+        self.introspect_token.return_value = None
+        assert self.oidc.introspect_token(self.request("token1"), self.client) is None
+        assert self.oidc.introspect_token(self.request("token1"), self.client) is None
+        assert self.introspect_token.call_count == 2
+
+    def test_expired_token_not_cached(self):
+        self.introspect_token.return_value = {"active": True, "exp": time.time() - 1}
+        self.oidc.introspect_token(self.request("token1"), self.client)
+        self.oidc.introspect_token(self.request("token1"), self.client)
+        assert self.introspect_token.call_count == 2
+
+
+class TestTTLCache:
+    def setup_method(self, method):
+        self.now = 0
+        self.cache = TTLCache(maxsize=2, ttl=10, timer=lambda: self.now)
+
+    def test_expire(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2, ttl=5)
+        assert self.cache.get("a") == 1
+        assert self.cache.get("b") == 2
+
+        self.now = 5
+        assert self.cache.get("a") == 1
+        assert self.cache.get("b") is None
+
+        self.now = 10
+        assert self.cache.get("a") is None
+        assert len(self.cache) == 0
+
+    def test_evict_oldest(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2)
+        self.cache.set("c", 3)
+        assert self.cache.get("a") is None
+        assert self.cache.get("b") == 2
+        assert self.cache.get("c") == 3
+
+    def test_evict_expired_first(self):
+        self.cache.set("a", 1)
+        self.cache.set("b", 2, ttl=1)
+        self.now = 1
+        self.cache.set("c", 3)
+        assert self.cache.get("a") == 1
+        assert self.cache.get("c") == 3
+
+    def test_pop(self):
+        self.cache.set("a", 1)
+        assert self.cache.pop("a") == 1
+        assert self.cache.pop("a") is None
+        assert self.cache.get("a") is None
+
+
+@pytest.mark.skipif(orjson is None, reason="orjson is not installed")
+class TestOrjsonProvider:
+    data = {
+        "b": [1, 2.5, None, True],
+        "a": {"time": datetime.datetime(2023, 1, 2, 3, 4, 5), "1": "x"},
+    }
+
+    def test_same_output(self, app):
+        provider = OrjsonProvider(app)
+        default = DefaultJSONProvider(app)
+        assert provider.dumps(self.data) == default.dumps(self.data, separators=(",", ":"))
+        assert provider.dumps(self.data, indent=2) == default.dumps(self.data, indent=2)
+        assert provider.loads(provider.dumps(self.data)) == default.loads(default.dumps(self.data))
+
+    def test_response(self, app):
+        provider = OrjsonProvider(app)
+        default = DefaultJSONProvider(app)
+        assert provider.response(self.data).data == default.response(self.data).data
+
+
 class TestGetResultsParseArgs:
     # TODO: write something!
     pass